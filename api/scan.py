@@ -20,7 +20,7 @@ class handler(BaseHTTPRequestHandler):
 
         result = scanner.run_scan(params)
 
-        body = json.dumps(result, default=scanner._json_default).encode()
+        body = scanner._json_dumps_bytes(result)
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
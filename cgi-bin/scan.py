@@ -14,17 +14,52 @@ import shutil
 import urllib.request
 import urllib.parse
 import urllib.error
+import http.client
+import threading
 import re
 import time
 import hashlib
+import heapq
+import zlib
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as futures_wait
 from datetime import datetime, timezone, timedelta
 from functools import lru_cache
 
+import scan_kernels
+
+# Optional C JSON parser; stdlib json.loads accepts bytes directly, so both
+# paths skip the explicit utf-8 decode pass on response/CLI payloads.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    from orjson import dumps as _orjson_dumps
+
+    def _json_dumps_bytes(data):
+        """Serialize a response payload to UTF-8 bytes (orjson C encoder)."""
+        return _orjson_dumps(data, default=_json_default)
+except ImportError:
+    def _json_dumps_bytes(data):
+        """Serialize a response payload to UTF-8 bytes (stdlib fallback)."""
+        return json.dumps(data, default=_json_default).encode("utf-8")
+
+# Repeated string fields (bookmaker, market_type, outcome names, ...) take the
+# same few values across thousands of entries — intern them so dict keying and
+# equality checks compare pointers instead of walking bytes.
+_intern = sys.intern
+
 # ─── Configuration ────────────────────────────────────────────────────────────
 
 _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# On read-only deployments the db lands in /tmp, which survives warm
+# serverless starts — a fresh process reads the previous invocation's
+# fetch payloads from the mmap'd sqlite file instead of re-hitting the
+# upstream APIs.
 DB_PATH = os.path.join(_PROJECT_ROOT, "data.db") if os.access(_PROJECT_ROOT, os.W_OK) else "/tmp/data.db"
 # Cache TTLs calibrated to each API's actual update frequency / rate limits:
 # - Polymarket: real-time CLOB, 300 req/10s limit — no cache needed
@@ -34,11 +69,40 @@ POLYMARKET_CACHE_TTL = 0
 KALSHI_CACHE_TTL = 15   # 20 req/s limit is tight with ~15 series per scan
 SPORTSBOOK_CACHE_TTL = 45  # their server only refreshes every 60s anyway
 
+# Adaptive sportsbook fetch tuning: EMA of per-sport response time above
+# which a sport is skipped for a scan, and how long the tuning state lives.
+_SPORT_SLOW_EMA = 8.0
+_SPORT_META_TTL = 7 * 86400
+
 # ─── Database helpers ─────────────────────────────────────────────────────────
 
+# One connection per thread, created on first use: repeat get_db() calls
+# (each fetcher, the scan pipeline, the writer thread) skip the connect
+# plus pragma/DDL setup.  sqlite handles can't cross threads, so the
+# cache is thread-local rather than a shared pool.
+_db_local = threading.local()
+
 def get_db():
+    db = getattr(_db_local, "db", None)
+    if db is not None:
+        return db
+    db = _open_db()
+    _db_local.db = db
+    return db
+
+def _open_db():
     db = sqlite3.connect(DB_PATH)
+    # Must precede table creation to take effect on a fresh db; existing dbs
+    # keep their layout until vacuumed, which purge_stale nudges along.
+    db.execute("PRAGMA auto_vacuum=INCREMENTAL")
     db.execute("PRAGMA journal_mode=WAL")
+    # WAL already guarantees consistency; NORMAL skips the per-commit fsync
+    # of the main db file.  The rest keeps temp structures and hot pages in
+    # memory — cache payloads are multi-hundred-KB JSON blobs.
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA temp_store=MEMORY")
+    db.execute("PRAGMA mmap_size=134217728")
+    db.execute("PRAGMA cache_size=-20000")
     db.execute("""CREATE TABLE IF NOT EXISTS config (
         key TEXT PRIMARY KEY,
         value TEXT
@@ -48,12 +112,29 @@ def get_db():
         data TEXT,
         ts REAL
     )""")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_cache_ts ON cache(ts)")
     db.commit()
     return db
 
+# Config values change O(once per admin action), so a short-TTL memo turns
+# the per-scan SELECTs (api key, devig method, alert settings) into dict
+# hits.  A TTL rather than explicit invalidation because the admin handler
+# writes from a different process — 60s bounds the staleness window.
+_config_memo = {}
+_config_memo_lock = threading.Lock()
+_CONFIG_MEMO_TTL = 60.0
+
 def get_config(db, key, default=None):
+    now = time.time()
+    with _config_memo_lock:
+        hit = _config_memo.get(key)
+        if hit is not None and now - hit[0] < _CONFIG_MEMO_TTL:
+            return default if hit[1] is None else hit[1]
     row = db.execute("SELECT value FROM config WHERE key=?", [key]).fetchone()
-    return row[0] if row else default
+    value = row[0] if row else None
+    with _config_memo_lock:
+        _config_memo[key] = (now, value)
+    return default if value is None else value
 
 def _safe_int(val, default=None):
     try:
@@ -61,63 +142,203 @@ def _safe_int(val, default=None):
     except (TypeError, ValueError):
         return default
 
+def _cache_object_hook(d):
+    """Rehydrate _tokens to an interned frozenset on cache load.
+
+    One conversion per load instead of a set() rebuild on every comparison
+    inside the matcher loops.
+    """
+    tokens = d.get("_tokens")
+    if tokens is not None:
+        d["_tokens"] = frozenset(map(_intern, tokens))
+    teams_set = d.get("_teams_set")
+    if teams_set is not None:
+        d["_teams_set"] = frozenset(teams_set)
+    return d
+
+# Process-global memo over the sqlite cache: a warm process (repeat CGI
+# hits, Vercel warm starts) skips the row read, JSON parse, and token
+# rehydration entirely.  Entries are (row_ts, data) so the in-memory copy
+# expires at exactly the same moment the sqlite row does.  Callers treat
+# cached payloads as read-only, so sharing one object is safe.
+_mem_cache = {}
+_mem_cache_lock = threading.Lock()
+
 def get_cached(db, cache_key, ttl=0):
-    row = db.execute("SELECT data, ts FROM cache WHERE cache_key=?", [cache_key]).fetchone()
-    if row and (time.time() - row[1]) < ttl:
-        return json.loads(row[0])
+    cutoff = time.time() - ttl
+    with _mem_cache_lock:
+        hit = _mem_cache.get(cache_key)
+    if hit is not None and hit[0] > cutoff:
+        return hit[1]
+    # TTL predicate in SQL: stale rows aren't transferred at all (the data
+    # column holds multi-hundred-KB JSON blobs).
+    row = db.execute("SELECT data, ts FROM cache WHERE cache_key=? AND ts > ?",
+                     [cache_key, cutoff]).fetchone()
+    if row:
+        data = json.loads(row[0], object_hook=_cache_object_hook)
+        with _mem_cache_lock:
+            _mem_cache[cache_key] = (row[1], data)
+        return data
     return None
 
 def get_stale_cached(db, cache_key):
     """Return cached data even if expired — used as fallback when API fails."""
+    with _mem_cache_lock:
+        hit = _mem_cache.get(cache_key)
+    if hit is not None:
+        return hit[1]
     row = db.execute("SELECT data, ts FROM cache WHERE cache_key=?", [cache_key]).fetchone()
     if row:
-        return json.loads(row[0])
+        data = json.loads(row[0], object_hook=_cache_object_hook)
+        with _mem_cache_lock:
+            _mem_cache[cache_key] = (row[1], data)
+        return data
     return None
 
 def _json_default(obj):
     if isinstance(obj, (set, frozenset)):
-        return list(obj)
+        return sorted(obj)
     raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
 
+# Connections with an open cache_txn — set_cached skips its per-call commit
+# for these so a batch of writes costs one WAL fsync instead of one each.
+_active_cache_txns = set()
+
+@contextmanager
+def cache_txn(db):
+    """Batch several set_cached/config writes into a single commit."""
+    key = id(db)
+    _active_cache_txns.add(key)
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        _active_cache_txns.discard(key)
+
+# Compact separators and raw UTF-8 (no \uXXXX escapes) keep cache rows small:
+# fewer bytes to the WAL per scan, fewer pages touched per get_cached.
+def _cache_dumps(data):
+    return json.dumps(data, default=_json_default,
+                      separators=(',', ':'), ensure_ascii=False)
+
 def set_cached(db, cache_key, data):
+    now = time.time()
     db.execute("INSERT OR REPLACE INTO cache (cache_key, data, ts) VALUES (?,?,?)",
-               [cache_key, json.dumps(data, default=_json_default), time.time()])
-    db.commit()
+               [cache_key, _cache_dumps(data), now])
+    if id(db) not in _active_cache_txns:
+        db.commit()
+    with _mem_cache_lock:
+        _mem_cache[cache_key] = (now, data)
+
+def purge_stale(db, max_age=86400):
+    """Evict cache rows too old even for the get_stale_cached fallback.
+
+    Runs opportunistically once per scan; the ts index makes the sweep
+    cheap and incremental vacuum hands freed pages back.
+    """
+    try:
+        db.execute("DELETE FROM cache WHERE ts < ?", [time.time() - max_age])
+        db.execute("PRAGMA incremental_vacuum(128)")
+        db.commit()
+    except sqlite3.Error:
+        pass
 
 # ─── HTTP helper ──────────────────────────────────────────────────────────────
 
+# Keep-alive connection pool.  The fetchers fire many parallel requests at a
+# handful of hosts (Gamma, Kalshi, The Odds API), and with urllib.request each
+# one paid a fresh TCP+TLS handshake.  Connections are reused per host across
+# threads; a request that fails on a reused (possibly stale) socket is retried
+# once on a fresh connection.
+_HTTP_HEADERS = {"User-Agent": "ArbScanner/1.0", "Accept": "application/json"}
+_HTTP_POOL_MAX_IDLE = 16
+_http_pool = defaultdict(list)  # host -> idle connections
+_http_pool_lock = threading.Lock()
+
+
+def _http_pool_get(host):
+    with _http_pool_lock:
+        idle = _http_pool[host]
+        return idle.pop() if idle else None
+
+
+def _http_pool_put(host, conn):
+    with _http_pool_lock:
+        idle = _http_pool[host]
+        if len(idle) < _HTTP_POOL_MAX_IDLE:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+def _http_get(url, timeout):
+    """GET over a pooled keep-alive connection → (status, reason, headers, body)."""
+    parsed = urllib.parse.urlsplit(url)
+    host = parsed.netloc
+    path = parsed.path or "/"
+    if parsed.query:
+        path += "?" + parsed.query
+    conn_cls = (http.client.HTTPSConnection if parsed.scheme == "https"
+                else http.client.HTTPConnection)
+    while True:
+        conn = _http_pool_get(host)
+        reused = conn is not None
+        if conn is None:
+            conn = conn_cls(host, timeout=timeout)
+        else:
+            # http.client only applies timeout at connect(); a reused socket
+            # keeps whatever deadline it was created with unless reset here.
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        try:
+            conn.request("GET", path, headers=_HTTP_HEADERS)
+            resp = conn.getresponse()
+            raw = resp.read()
+            headers = dict(resp.getheaders())
+            if resp.will_close:
+                conn.close()
+            else:
+                _http_pool_put(host, conn)
+            return resp.status, resp.reason, headers, raw
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            if not reused:
+                raise
+
+
 def fetch_json(url, timeout=12):
     """Fetch JSON from a URL with error handling."""
     try:
-        req = urllib.request.Request(url, headers={
-            "User-Agent": "ArbScanner/1.0",
-            "Accept": "application/json"
-        })
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            raw = resp.read().decode("utf-8")
-            return json.loads(raw)
+        status, reason, _headers, raw = _http_get(url, timeout)
+        if status >= 400:
+            return {"_error": f"HTTP {status}: {reason}"}
+        return _json_loads(raw)
     except Exception as e:
         return {"_error": str(e)}
 
 def fetch_json_with_headers(url, timeout=12):
     """Like fetch_json but also returns response headers (for API quota tracking)."""
     try:
-        req = urllib.request.Request(url, headers={
-            "User-Agent": "ArbScanner/1.0",
-            "Accept": "application/json"
-        })
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            headers = dict(resp.headers)
-            raw = resp.read().decode("utf-8")
-            return json.loads(raw), headers
-    except urllib.error.HTTPError as e:
-        return {"_error": f"HTTP {e.code}: {e.reason}"}, {}
+        status, reason, headers, raw = _http_get(url, timeout)
+        if status >= 400:
+            return {"_error": f"HTTP {status}: {reason}"}, {}
+        return _json_loads(raw), headers
     except Exception as e:
         return {"_error": str(e)}, {}
 
 # ─── Odds conversion utilities ───────────────────────────────────────────────
 
+@lru_cache(maxsize=8192)
 def american_to_decimal(american):
+    # Memoized: books quote from a small set of American odds, so the
+    # same integers recur across every bookmaker x market x outcome row.
     american = float(american)
     if american > 0:
         return (american / 100.0) + 1.0
@@ -131,7 +352,11 @@ def decimal_to_implied_prob(decimal_odds):
 def american_to_implied_prob(american):
     return decimal_to_implied_prob(american_to_decimal(american))
 
+@lru_cache(maxsize=4096)
 def implied_prob_to_american(prob):
+    # Memoized: prediction prices are cent-quantized, so the same probs
+    # recur across opportunities and scans — a dict hit replaces the
+    # branch+divide+round without changing any output.
     if prob <= 0 or prob >= 1:
         return 0
     if prob >= 0.5:
@@ -259,31 +484,105 @@ TEAM_ALIASES = {
     "ipswich": "ipswich town",
 }
 
+# Intern the canonical names: many aliases map to the same full string, and
+# entries/team indexes hold these values by the thousand — pointer-shared
+# copies make the frequent equality/hash operations on them cheap.
+TEAM_ALIASES = {alias: _intern(full) for alias, full in TEAM_ALIASES.items()}
+
+# Hot-path text pipeline: the char-class strip and whitespace collapse in
+# normalize_name run on every market, so the regexes are compiled once and the
+# ASCII strip is done with str.translate (a single C pass over the bytes).
+# The table is derived from the regex itself so the two paths agree exactly.
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
+_WS_RE = re.compile(r'\s+')
+_STRIP_TABLE = {c: None for c in range(128) if _NON_ALNUM_RE.match(chr(c))}
+_OVER_RE = re.compile(r'\bover\b')
+_UNDER_RE = re.compile(r'\bunder\b')
+
+# Single-pass alias scanner: instead of running `alias in text` for every one
+# of the ~290 TEAM_ALIASES keys, one compiled alternation (longest-first, in a
+# lookahead so overlapping hits aren't swallowed) walks the text once.  Python's
+# re engine runs the scan in C, which serves the same purpose as an
+# Aho-Corasick automaton without a third-party dependency.
+_ALIAS_SCAN_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(TEAM_ALIASES, key=len, reverse=True))) + "))")
+
+# A lookahead match reports only the longest alias starting at a position, so
+# shorter aliases that are prefixes of a longer one need restoring by table.
+_ALIAS_PREFIXES = {
+    a: [b for b in TEAM_ALIASES if b != a and a.startswith(b)]
+    for a in TEAM_ALIASES
+}
+
+# Insertion order of TEAM_ALIASES — replacement order is significant, so
+# candidate aliases are replayed in dict order.
+_ALIAS_ORDER = {a: i for i, a in enumerate(TEAM_ALIASES)}
+
+# Replacing an alias with its full name can introduce *new* alias substrings
+# (e.g. "boston" → "boston celtics" introduces "celtics"), which the
+# sequential replacement loop in normalize_name also rewrites.
+_ALIASES_IN_FULL = {
+    full: [a for a in TEAM_ALIASES if a in full]
+    for full in set(TEAM_ALIASES.values())
+}
+
+
+@lru_cache(maxsize=4096)
+def _scan_alias_keys(text):
+    """Return the set of TEAM_ALIASES keys contained in text (one pass).
+
+    Memoized so normalize_name and extract_teams_from_text share a single
+    sweep when the parsers run both over the same market text; callers
+    treat the result as read-only (it's a frozenset).
+    """
+    found = set()
+    for alias in _ALIAS_SCAN_RE.findall(text):
+        found.add(alias)
+        found.update(_ALIAS_PREFIXES[alias])
+    return frozenset(found)
+
+
 @lru_cache(maxsize=4096)
 def normalize_name(name):
     """Normalize team/player name for matching."""
     if not name:
         return ""
     name = name.lower().strip()
-    name = re.sub(r'[^a-z0-9\s]', '', name)
-    name = re.sub(r'\s+', ' ', name)
+    if name.isascii():
+        name = name.translate(_STRIP_TABLE)
+    else:
+        name = _NON_ALNUM_RE.sub('', name)
+    name = _WS_RE.sub(' ', name)
     # Check aliases
     if name in TEAM_ALIASES:
         return TEAM_ALIASES[name]
-    # Check if any alias is contained
-    for alias, full in TEAM_ALIASES.items():
+    # Candidate aliases from one scan, closed over aliases their replacement
+    # text can introduce.  Non-sports strings (the common case for arbitrary
+    # market text) exit here without any containment checks.
+    stack = list(_scan_alias_keys(name))
+    if not stack:
+        return name.strip()
+    candidates = set()
+    while stack:
+        a = stack.pop()
+        if a in candidates:
+            continue
+        candidates.add(a)
+        stack.extend(_ALIASES_IN_FULL[TEAM_ALIASES[a]])
+    # Replay only the candidates, in original dict order — replacement order
+    # is significant to the sequential-replace semantics.
+    for alias in sorted(candidates, key=_ALIAS_ORDER.__getitem__):
         if alias in name:
-            name = name.replace(alias, full)
+            name = name.replace(alias, TEAM_ALIASES[alias])
     return name.strip()
 
 def extract_teams_from_text(text):
     """Extract potential team names from market text."""
-    text = text.lower()
+    aliases_present = _scan_alias_keys(text.lower())
     found = []
     for alias, full in TEAM_ALIASES.items():
-        if alias in text:
-            if full not in found:
-                found.append(full)
+        if alias in aliases_present and full not in found:
+            found.append(full)
     return found
 
 def similarity_score(a, b):
@@ -292,23 +591,28 @@ def similarity_score(a, b):
         return 0
     tokens_a = set(normalize_name(a).split())
     tokens_b = set(normalize_name(b).split())
-    if not tokens_a or not tokens_b:
-        return 0
-    intersection = tokens_a & tokens_b
-    union = tokens_a | tokens_b
-    return len(intersection) / len(union)
+    return similarity_score_from_tokens(tokens_a, tokens_b)
+
+def similarity_score_from_tokens(tokens_a, tokens_b, threshold=0.0):
+    """Token overlap similarity from pre-computed token frozensets.
+
+    Entries always carry _tokens as frozensets (cache loads rehydrate them),
+    so no per-call set() conversion happens in the N x M matcher loops.
 
-def similarity_score_from_tokens(tokens_a, tokens_b):
-    """Token overlap similarity from pre-computed token sets (or lists from cache)."""
+    threshold: when the caller discards scores below a cutoff, pass it here.
+    Jaccard is bounded by set sizes alone (|A∩B| <= min sizes), so pairs that
+    cannot reach the cutoff return 0 without comparing any elements.
+    """
     if not tokens_a or not tokens_b:
         return 0
-    if not isinstance(tokens_a, set):
-        tokens_a = set(tokens_a)
-    if not isinstance(tokens_b, set):
-        tokens_b = set(tokens_b)
-    intersection = tokens_a & tokens_b
-    union = tokens_a | tokens_b
-    return len(intersection) / len(union)
+    la, lb = len(tokens_a), len(tokens_b)
+    if threshold > 0.0 and min(la, lb) < threshold * max(la, lb):
+        return 0
+    intersection = len(tokens_a & tokens_b)
+    union = la + lb - intersection
+    if threshold > 0.0 and intersection < threshold * union:
+        return 0
+    return intersection / union
 
 def _parse_event_date(dt_str):
     """Extract date from an ISO datetime string. Returns datetime.date or None."""
@@ -337,6 +641,41 @@ SPORT_KEY_TO_CATEGORY = {
     "mma_mixed_martial_arts": "mma",
 }
 
+# Odds API sport key → display label, resolved once at parse time so the
+# opportunity builders do a dict lookup instead of substring ladders.
+SPORT_KEY_TO_DISPLAY = {
+    "basketball_nba": "NBA",
+    "americanfootball_nfl": "NFL",
+    "baseball_mlb": "MLB",
+    "icehockey_nhl": "NHL",
+    "soccer_usa_mls": "Soccer",
+    "soccer_epl": "Soccer",
+    "mma_mixed_martial_arts": "MMA",
+}
+
+# Frontend sport filter labels → internal sport categories, used to push the
+# sports= query filter down into the fetch stage.
+DISPLAY_TO_CATEGORY = {
+    "NBA": "nba", "NFL": "nfl", "MLB": "mlb", "NHL": "nhl",
+    "SOCCER": "soccer", "MMA": "mma", "BOXING": "boxing",
+}
+
+
+def _filter_categories(sports):
+    """Translate an upper-cased sports filter into a category set.
+
+    Returns None (meaning "no restriction") when the filter is empty or
+    contains labels we can't map — better to over-fetch than silently
+    drop a sport the caller asked for.
+    """
+    if not sports:
+        return None
+    cats = {DISPLAY_TO_CATEGORY[s] for s in sports if s in DISPLAY_TO_CATEGORY}
+    if not cats or len(cats) != len(sports):
+        return None
+    return cats
+
+
 SPORT_CATEGORY_KEYWORDS = {
     "nba": ["nba", "basketball"],
     "nfl": ["nfl", "football", "touchdowns", "yards"],
@@ -449,6 +788,9 @@ def _display_event_key(event_key):
 
 def _sport_display_from_entry(entry):
     """Return a human-friendly sport label from a sportsbook entry."""
+    display = entry.get("_sport_display")
+    if display:  # resolved at parse time for sportsbook entries
+        return display
     sport = entry.get("sport", "").replace("_", " ").lower()
     cat = entry.get("_sport_category", "")
     if cat == "nba" or "nba" in sport or "basketball" in sport:
@@ -468,14 +810,25 @@ def _sport_display_from_entry(entry):
     return sport[:10].title() if sport else "Sports"
 
 
-def _detect_sport_category(text):
+# Dict position of each category — the scanner returns an unordered tag set,
+# and ties are broken the way the old sequential keyword loop did.
+_CATEGORY_PRECEDENCE = {cat: i for i, cat in enumerate(SPORT_CATEGORY_KEYWORDS)}
+
+
+def _detect_sport_category(text, teams=None):
     """Detect sport category from text keywords or team names."""
     text_lower = text.lower()
-    for category, keywords in SPORT_CATEGORY_KEYWORDS.items():
-        if any(kw in text_lower for kw in keywords):
-            return category
+    best = None
+    for tag in _scan_keyword_tags(text_lower):
+        if type(tag) is tuple:
+            cat = tag[1]
+            if best is None or _CATEGORY_PRECEDENCE[cat] < _CATEGORY_PRECEDENCE[best]:
+                best = cat
+    if best is not None:
+        return best
     # Fall back to team name detection
-    teams = extract_teams_from_text(text)
+    if teams is None:
+        teams = extract_teams_from_text(text)
     for team in teams:
         if team in TEAM_TO_SPORT:
             return TEAM_TO_SPORT[team]
@@ -497,23 +850,31 @@ SERIES_MARKET_SUBTYPE = {
 
 # Which sportsbook market_type values each prediction subtype can match
 _MARKET_TYPE_COMPAT = {
-    "h2h": {"h2h"},
-    "spreads": {"spreads"},
-    "totals": {"totals"},
-    "winning_margin": set(),    # Kalshi "wins by over X" ≠ standard sportsbook spreads
-    "1h_totals": set(),         # No sportsbook 1st-half data available
-    "player_props": {"player_points", "player_rebounds", "player_assists", "player_threes"},
-    "futures": set(),           # Season/championship markets don't match single-game odds
-    "unknown": {"h2h", "spreads", "totals", "player_points", "player_rebounds",
-                "player_assists", "player_threes"},
+    "h2h": frozenset({"h2h"}),
+    "spreads": frozenset({"spreads"}),
+    "totals": frozenset({"totals"}),
+    "winning_margin": frozenset(),  # Kalshi "wins by over X" ≠ standard sportsbook spreads
+    "1h_totals": frozenset(),       # No sportsbook 1st-half data available
+    "player_props": frozenset({"player_points", "player_rebounds",
+                               "player_assists", "player_threes"}),
+    "futures": frozenset(),         # Season/championship markets don't match single-game odds
+    "unknown": frozenset({"h2h", "spreads", "totals", "player_points",
+                          "player_rebounds", "player_assists", "player_threes"}),
 }
 
-_FUTURES_RE = re.compile(
-    r"championship|stanley cup|world series|super bowl|"
-    r"mvp|most valuable|make.*playoffs|win.*20\d\d|"
-    r"nba finals|win.*title|win.*division|win.*conference",
-    re.IGNORECASE,
-)
+# Fixed futures phrases live in the shared keyword scanner below; the gapped
+# patterns ("win ... title") can't be literals, so a small regex covers them.
+_FUTURES_LITERALS = frozenset([
+    "championship", "stanley cup", "world series", "super bowl",
+    "mvp", "most valuable", "nba finals",
+])
+_FUTURES_GAP_RE = re.compile(
+    r"make.*playoffs|win.*(?:20\d\d|title|division|conference)")
+
+
+def _is_futures_text(q):
+    """True if lowercased question text looks like a futures market."""
+    return "futures" in _scan_keyword_tags(q) or bool(_FUTURES_GAP_RE.search(q))
 
 _POINT_LINE_RE = re.compile(
     r'(?:over|under|spread|cover|[+-])\s*(\d+(?:\.\d+)?)',
@@ -524,10 +885,10 @@ _POINT_LINE_RE = re.compile(
 def _infer_market_subtype(question):
     """Infer market subtype from prediction market question text."""
     q = question.lower()
-    has_over = bool(re.search(r'\bover\b', q))
-    has_under = bool(re.search(r'\bunder\b', q))
+    has_over = bool(_OVER_RE.search(q))
+    has_under = bool(_UNDER_RE.search(q))
     # Futures / championship — check first (may also contain "win")
-    if _FUTURES_RE.search(question):
+    if _is_futures_text(q):
         return "futures"
     # Spreads — check before totals (avoid "cover" containing "over")
     if "spread" in q or "cover" in q:
@@ -548,8 +909,27 @@ def _infer_market_subtype(question):
     return "unknown"
 
 
+@lru_cache(maxsize=4096)
+def prepare_text(raw):
+    """
+    Classify market text once: returns (teams, sport_category, market_subtype)
+    with teams as a tuple.  The fetch pipeline looks at the same question at
+    several stages (filtering, category detection, entry building), so each
+    distinct text is scanned once per process instead of once per stage.
+    """
+    teams = tuple(extract_teams_from_text(raw))
+    category = _detect_sport_category(raw, teams)
+    subtype = _infer_market_subtype(raw)
+    return teams, category, subtype
+
+
+@lru_cache(maxsize=4096)
 def _extract_point_line(text):
-    """Extract point line (e.g., 215.5) from question text."""
+    """Extract point line (e.g., 215.5) from question text.
+
+    Memoized — the same question strings recur across scans for the life
+    of the cache TTL, and the regex scan costs O(len) each time.
+    """
     m = _POINT_LINE_RE.search(text)
     return float(m.group(1)) if m else None
 
@@ -572,6 +952,45 @@ _WEAK_SPORT_KW = frozenset([
 ])
 SPORT_KEYWORDS = _STRONG_SPORT_KW | _WEAK_SPORT_KW
 
+# Unified keyword scanner, same single-pass alternation technique as the
+# team-alias scanner: strong/weak sport keywords, futures phrases and
+# sport-category keywords fold into one automaton so each classifier walks
+# its text once instead of looping over its own keyword set.
+
+
+def _build_keyword_scanner():
+    tags = {}
+
+    def tag(kw, t):
+        tags.setdefault(kw, set()).add(t)
+
+    for kw in _STRONG_SPORT_KW:
+        tag(kw, "strong")
+    for kw in _WEAK_SPORT_KW:
+        tag(kw, "weak")
+    for kw in _FUTURES_LITERALS:
+        tag(kw, "futures")
+    for cat, kws in SPORT_CATEGORY_KEYWORDS.items():
+        for kw in kws:
+            tag(kw, ("category", cat))
+    rx = re.compile(
+        "(?=(" + "|".join(map(re.escape, sorted(tags, key=len, reverse=True))) + "))")
+    prefixes = {a: [b for b in tags if b != a and a.startswith(b)] for a in tags}
+    return rx, prefixes, tags
+
+
+_KEYWORD_SCAN_RE, _KEYWORD_PREFIXES, _KEYWORD_TAGS = _build_keyword_scanner()
+
+
+def _scan_keyword_tags(text):
+    """Union of tags for every keyword literal contained in text (one pass)."""
+    found = set()
+    for kw in _KEYWORD_SCAN_RE.findall(text):
+        found.update(_KEYWORD_TAGS[kw])
+        for p in _KEYWORD_PREFIXES[kw]:
+            found.update(_KEYWORD_TAGS[p])
+    return found
+
 def _fetch_polymarket_via_cli():
     """
     Fetch all active Polymarket markets via CLI in a single call,
@@ -581,14 +1000,16 @@ def _fetch_polymarket_via_cli():
     or None if the CLI call fails.
     """
     try:
+        # Capture stdout as bytes and hand them straight to the JSON parser —
+        # no text-mode decode pass over the ~500-market payload.
         result = subprocess.run(
             ["polymarket", "-o", "json", "markets", "list",
              "--active", "true", "--closed", "false", "--limit", "500"],
-            capture_output=True, text=True, timeout=15,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=15,
         )
         if result.returncode != 0:
             return None
-        all_markets = json.loads(result.stdout)
+        all_markets = _json_loads(result.stdout)
         if not isinstance(all_markets, list):
             return None
     except (subprocess.TimeoutExpired, json.JSONDecodeError, FileNotFoundError):
@@ -597,25 +1018,124 @@ def _fetch_polymarket_via_cli():
     sports_markets = _filter_sports_markets(all_markets)
     return sports_markets
 
+def _market_text(m):
+    """Composite lowercased market text: question + description + tags.
+
+    One f-string build and one lower() per market — the classifiers all
+    scan this same buffer.
+    """
+    tags = m.get("tags") or []
+    return f'{m.get("question", "")} {m.get("description", "")} {" ".join(tags)}'.lower()
+
 def _filter_sports_markets(markets):
     """Filter a list of raw market dicts to only sports-related ones."""
     filtered = []
     for m in markets:
-        title = (m.get("question", "") + " " + m.get("description", "")
-                 + " " + " ".join(m.get("tags") or [])).lower()
-        has_strong = any(kw in title for kw in _STRONG_SPORT_KW)
+        title = _market_text(m)
+        has_strong = "strong" in _scan_keyword_tags(title)
         has_team = bool(extract_teams_from_text(title))
         if has_strong or has_team:
             filtered.append(m)
     return filtered
 
+@lru_cache(maxsize=256)
+def _parse_json_field(s):
+    """Decode a Gamma API JSON-encoded string field, memoized.
+
+    Fields like outcomes='["Yes", "No"]' repeat across most markets, so the
+    decode runs once per distinct string.  Callers treat the result as
+    read-only (the same object is shared between entries).
+    """
+    try:
+        return _json_loads(s)
+    except ValueError:
+        return []
+
+
+def get_tokens(entry):
+    """Decode a Polymarket entry's CLOB token ids on first use.
+
+    The scan path never reads them, so entries carry the raw Gamma string
+    and only trade-placement callers pay the decode.
+    """
+    raw = entry.get("_tokens_raw")
+    if isinstance(raw, str):
+        return _parse_json_field(raw) if raw else []
+    return raw or []
+
+
+def _fetch_polymarket_paged():
+    """
+    Single paginated active-markets fetch, filtered for sports locally.
+
+    One coarse fetch beats the 12-tag fan-out: the pages ride one keep-alive
+    connection, the results don't need deduplicating across overlapping tag
+    sets, and the keyword scanner classifies sports faster than a dozen
+    server-side tag queries return.
+    """
+    markets = []
+    offset = 0
+    while True:
+        url = ("https://gamma-api.polymarket.com/markets"
+               f"?closed=false&active=true&limit=500&offset={offset}")
+        data = fetch_json(url)
+        if isinstance(data, dict) and not data.get("_error") and "markets" in data:
+            data = data["markets"]
+        if not isinstance(data, list) or not data:
+            break
+        markets.extend(data)
+        if len(data) < 500 or offset >= 3000:  # short page = done; cap pages
+            break
+        offset += 500
+    return _filter_sports_markets(markets)
+
+
+def _fetch_polymarket_tagged():
+    """Legacy per-tag parallel fetch (POLYMARKET_TAGGED_FETCH=1 diagnostics)."""
+    markets = []
+    sport_tags = ["sports", "nba", "nfl", "mlb", "nhl", "soccer", "football",
+                  "basketball", "baseball", "hockey", "mma", "ufc"]
+
+    def _fetch_tag(tag):
+        url = f"https://gamma-api.polymarket.com/markets?tag={tag}&closed=false&limit=100"
+        data = fetch_json(url)
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict) and not data.get("_error") and "markets" in data:
+            return data["markets"]
+        return []
+
+    def _fetch_untagged():
+        url = "https://gamma-api.polymarket.com/markets?closed=false&limit=200&active=true"
+        data = fetch_json(url)
+        if isinstance(data, list):
+            return _filter_sports_markets(data)
+        return []
+
+    with ThreadPoolExecutor(max_workers=14) as pool:
+        tag_futures = [pool.submit(_fetch_tag, tag) for tag in sport_tags]
+        untagged_future = pool.submit(_fetch_untagged)
+        for f in as_completed(tag_futures + [untagged_future]):
+            try:
+                markets.extend(f.result(timeout=12))
+            except Exception:
+                continue
+    return markets
+
+
 # ─── Data fetchers ────────────────────────────────────────────────────────────
 
-def fetch_polymarket_sports(db=None):
-    """Fetch sports markets from Polymarket Gamma API."""
+def fetch_polymarket_sports(db=None, sports=None):
+    """Fetch sports markets from Polymarket Gamma API.
+
+    sports: optional upper-cased filter set (e.g. {"NBA"}); markets whose
+    detected category falls outside it are dropped at parse time.
+    """
     if db is None:
         db = get_db()
-    cache_key = "polymarket_sports"
+    categories = _filter_categories(sports)
+    cache_key = ("polymarket_sports" if categories is None
+                 else "polymarket_sports|" + ",".join(sorted(categories)))
     cached = get_cached(db, cache_key, ttl=POLYMARKET_CACHE_TTL)
     if cached is not None:
         return cached
@@ -626,72 +1146,42 @@ def fetch_polymarket_sports(db=None):
         markets = _fetch_polymarket_via_cli()
 
     if markets is None:
-        # HTTP fallback: parallel fetch across all sport tags
-        markets = []
-        sport_tags = ["sports", "nba", "nfl", "mlb", "nhl", "soccer", "football",
-                      "basketball", "baseball", "hockey", "mma", "ufc"]
-
-        def _fetch_tag(tag):
-            url = f"https://gamma-api.polymarket.com/markets?tag={tag}&closed=false&limit=100"
-            data = fetch_json(url)
-            if isinstance(data, list):
-                return data
-            if isinstance(data, dict) and not data.get("_error") and "markets" in data:
-                return data["markets"]
-            return []
-
-        def _fetch_untagged():
-            url = "https://gamma-api.polymarket.com/markets?closed=false&limit=200&active=true"
-            data = fetch_json(url)
-            if isinstance(data, list):
-                return [m for m in data
-                        if any(kw in (m.get("question", "") + " " + m.get("description", "")).lower()
-                               for kw in _STRONG_SPORT_KW)
-                        or extract_teams_from_text(
-                            (m.get("question", "") + " " + m.get("description", "")).lower())]
-            return []
-
-        with ThreadPoolExecutor(max_workers=14) as pool:
-            tag_futures = [pool.submit(_fetch_tag, tag) for tag in sport_tags]
-            untagged_future = pool.submit(_fetch_untagged)
-            for f in as_completed(tag_futures + [untagged_future]):
-                try:
-                    markets.extend(f.result(timeout=12))
-                except Exception:
-                    continue
+        # HTTP fallback: one coarse paginated fetch classified locally, unless
+        # the old per-tag fan-out is requested for diagnostics.
+        if os.environ.get("POLYMARKET_TAGGED_FETCH") == "1":
+            markets = _fetch_polymarket_tagged()
+        else:
+            markets = _fetch_polymarket_paged()
 
-    # Deduplicate by condition_id
-    seen = set()
-    unique = []
+    # Deduplicate by condition_id — one insertion-ordered dict (setdefault
+    # keeps the first occurrence) instead of a seen-set plus a parallel list.
+    unique_by_cid = {}
     for m in markets:
         cid = m.get("conditionId") or m.get("condition_id") or m.get("id", "")
-        if cid and cid not in seen:
-            seen.add(cid)
-            unique.append(m)
-
-    # Parse into normalized format
-    results = []
+        if cid:
+            unique_by_cid.setdefault(cid, m)
+    unique = list(unique_by_cid.values())
+
+    # Parse in two stages.  Stage 1 decodes the JSON-encoded string fields
+    # (memoized — strings like '["Yes", "No"]' repeat across most markets)
+    # and drops incomplete markets, so stage 2's entry-building loop stays
+    # short and branch-free for the interpreter.
+    staged = []
     for m in unique:
+        question = m.get("question", "") or m.get("title", "")
+        outcomes = m.get("outcomes", [])
+        outcome_prices = m.get("outcomePrices", [])
+        if isinstance(outcomes, str):
+            outcomes = _parse_json_field(outcomes)
+        if isinstance(outcome_prices, str):
+            outcome_prices = _parse_json_field(outcome_prices)
+        if outcomes and outcome_prices:
+            staged.append((m, question, outcomes, outcome_prices))
+
+    # Stage 2: price coercion + (memoized) text classification per market.
+    results = []
+    for m, question, outcomes, outcome_prices in staged:
         try:
-            question = m.get("question", "") or m.get("title", "")
-            outcomes = m.get("outcomes", [])
-            outcome_prices = m.get("outcomePrices", [])
-            tokens = m.get("clobTokenIds", [])
-
-            # Parse JSON-encoded strings from Gamma API
-            if isinstance(outcomes, str):
-                try: outcomes = json.loads(outcomes)
-                except (json.JSONDecodeError, ValueError): outcomes = []
-            if isinstance(outcome_prices, str):
-                try: outcome_prices = json.loads(outcome_prices)
-                except (json.JSONDecodeError, ValueError): outcome_prices = []
-            if isinstance(tokens, str):
-                try: tokens = json.loads(tokens)
-                except (json.JSONDecodeError, ValueError): tokens = []
-
-            if not outcomes or not outcome_prices:
-                continue
-
             prices = []
             for p in outcome_prices:
                 try:
@@ -699,6 +1189,7 @@ def fetch_polymarket_sports(db=None):
                 except (ValueError, TypeError):
                     prices.append(0)
 
+            q_teams, q_category, q_subtype = prepare_text(question)
             entry = {
                 "source": "polymarket",
                 "id": m.get("conditionId") or m.get("condition_id") or m.get("id", ""),
@@ -706,17 +1197,26 @@ def fetch_polymarket_sports(db=None):
                 "description": m.get("description", ""),
                 "outcomes": outcomes,
                 "prices": prices,
-                "tokens": tokens,
+                # CLOB token ids stay as the raw Gamma string; nothing in
+                # the scan path reads them — get_tokens decodes on demand.
+                "_tokens_raw": m.get("clobTokenIds", ""),
                 "end_date": m.get("endDate") or m.get("end_date_iso", ""),
                 "volume": m.get("volume", 0),
                 "liquidity": m.get("liquidity", 0),
                 "slug": m.get("slug", ""),
-                "teams": extract_teams_from_text(question),
-                "_tokens": set(normalize_name(question + " " + (m.get("description", "") or "")).split()),
-                "_sport_category": _detect_sport_category(question),
-                "_market_subtype": _infer_market_subtype(question),
+                "teams": list(q_teams),
+                "_teams_set": frozenset(q_teams),
+                "_tokens": frozenset(map(_intern, normalize_name(" ".join((question, m.get("description", "") or ""))).split())),
+                "_sport_category": q_category,
+                "_market_subtype": q_subtype,
                 "url": f"https://polymarket.com/event/{m.get('slug', '')}" if m.get('slug') else "",
             }
+            # Push the sports filter down: drop markets whose category is
+            # known and excluded (unknown categories are kept — they may
+            # still match once paired with sportsbook data).
+            if categories is not None and entry["_sport_category"] \
+                    and entry["_sport_category"] not in categories:
+                continue
             results.append(entry)
         except Exception:
             continue
@@ -778,6 +1278,14 @@ KALSHI_SERIES_SLUG = {
     "KXMLSGAME": "major-league-soccer-game",
 }
 
+# Flattened (sport, ticker, category) view of KALSHI_SPORTS_SERIES, built
+# once instead of on every uncached fetch.
+_KALSHI_ALL_SERIES = tuple(
+    (sport, ticker, category)
+    for sport, series_list in KALSHI_SPORTS_SERIES.items()
+    for ticker, category in series_list
+)
+
 
 def _kalshi_build_url(ticker, series_ticker, event_ticker=""):
     """Build correct Kalshi market URL: /markets/{series}/{slug}/{event_ticker}
@@ -796,6 +1304,52 @@ def _kalshi_build_url(ticker, series_ticker, event_ticker=""):
     return f"https://kalshi.com/markets/{page_id}"
 
 
+class _RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, across threads."""
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self._lock = threading.Lock()
+        self._allowance = self.rate
+        self._last = time.monotonic()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._allowance = min(
+                    self.rate, self._allowance + (now - self._last) * self.rate)
+                self._last = now
+                if self._allowance >= 1.0:
+                    self._allowance -= 1.0
+                    return
+                wait = (1.0 - self._allowance) / self.rate
+            time.sleep(wait)
+
+
+# Kalshi Basic tier allows 20 reads/sec; pace at 18 to stay safely under it
+# while letting the worker pool run wide.
+_KALSHI_RATE = _RateLimiter(18)
+
+
+def _kalshi_raw_yes_price(m):
+    """Raw yes price as a float: last_price primary, yes_ask then yes_bid.
+
+    Always returns a clean number — the whole column goes through one batch
+    kernel call, so a single malformed price must zero out its own market
+    rather than abort the conversion for every market in the fetch.
+    """
+    # Primary: last traded price (matches what Kalshi UI displays)
+    yes_price = m.get("last_price", 0) or 0
+    # Fallback: yes_ask (the actual cost to buy YES right now)
+    if not yes_price:
+        yes_price = m.get("yes_ask", 0) or m.get("yes_bid", 0) or 0
+    try:
+        return float(yes_price)
+    except (TypeError, ValueError):
+        return 0.0
+
+
 def _kalshi_parse_price(m):
     """
     Parse Kalshi market prices (in cents 0-100) to probabilities (0-1).
@@ -803,13 +1357,7 @@ def _kalshi_parse_price(m):
     as fallback. Avoids yes_bid which can be far below the actual market price
     due to wide bid/ask spreads.
     """
-    # Primary: last traded price (matches what Kalshi UI displays)
-    yes_price = m.get("last_price", 0) or 0
-
-    # Fallback: yes_ask (the actual cost to buy YES right now)
-    if yes_price == 0:
-        yes_price = m.get("yes_ask", 0) or m.get("yes_bid", 0) or 0
-
+    yes_price = _kalshi_raw_yes_price(m)
     yes_prob = yes_price / 100.0 if yes_price > 1 else float(yes_price)
 
     # NO price is complement (binary market: YES + NO = 100 cents)
@@ -817,25 +1365,30 @@ def _kalshi_parse_price(m):
     return yes_prob, no_prob
 
 
-def fetch_kalshi_sports(db=None):
-    """Fetch sports markets from Kalshi via series → markets API."""
+def fetch_kalshi_sports(db=None, sports=None):
+    """Fetch sports markets from Kalshi via series → markets API.
+
+    sports: optional upper-cased filter set; series for other sports are
+    skipped entirely, saving those API calls.
+    """
     if db is None:
         db = get_db()
-    cache_key = "kalshi_sports"
+    categories = _filter_categories(sports)
+    cache_key = ("kalshi_sports" if categories is None
+                 else "kalshi_sports|" + ",".join(sorted(categories)))
     cached = get_cached(db, cache_key, ttl=KALSHI_CACHE_TTL)
     if cached is not None:
         return cached
 
-    # Collect all series tickers with their sport categories
-    all_series = []
-    for sport, series_list in KALSHI_SPORTS_SERIES.items():
-        for ticker, category in series_list:
-            all_series.append((ticker, category))
+    # Series tickers with their sport categories (precomputed flat view)
+    all_series = [(t, c) for sport, t, c in _KALSHI_ALL_SERIES
+                  if categories is None or sport in categories]
 
     # Fetch markets for all series in parallel (skip events step)
     raw_markets = []  # (market_dict, sport_category)
 
     def _fetch_series_markets(series_ticker, category):
+        _KALSHI_RATE.acquire()
         url = (f"https://api.elections.kalshi.com/trade-api/v2/markets"
                f"?series_ticker={series_ticker}&status=open&limit=200")
         data = fetch_json(url)
@@ -845,8 +1398,9 @@ def fetch_kalshi_sports(db=None):
                 mkts.append((m, category, series_ticker))
         return mkts
 
-    # Kalshi Basic tier: 20 reads/sec — 5 workers avoids throttling
-    with ThreadPoolExecutor(max_workers=5) as pool:
+    # Wide pool; the shared token bucket (not the worker count) enforces the
+    # 20 reads/sec Basic-tier limit, so slow responses don't serialize the rest.
+    with ThreadPoolExecutor(max_workers=16) as pool:
         futures = [pool.submit(_fetch_series_markets, t, c) for t, c in all_series]
         for future in as_completed(futures):
             try:
@@ -854,12 +1408,16 @@ def fetch_kalshi_sports(db=None):
             except Exception:
                 continue
 
-    # Normalize into standard format
+    # Normalize into standard format.  Price conversion is columnar: extract
+    # the raw yes price per market, convert the whole column in one batch
+    # kernel call, then build entries.
+    yes_probs = scan_kernels.kalshi_yes_probs(
+        [_kalshi_raw_yes_price(m) for m, _c, _t in raw_markets])
     results = []
-    for m, category, series_ticker in raw_markets:
+    for (m, category, series_ticker), yes_prob in zip(raw_markets, yes_probs):
         try:
             title = m.get("title", "")
-            yes_prob, no_prob = _kalshi_parse_price(m)
+            no_prob = 1.0 - yes_prob if yes_prob > 0 else 0
 
             # Use floor_strike for point line (totals/spreads/props)
             floor_strike = m.get("floor_strike")
@@ -877,8 +1435,9 @@ def fetch_kalshi_sports(db=None):
                 "liquidity": m.get("open_interest", 0),
                 "ticker": m.get("ticker", ""),
                 "event_ticker": m.get("event_ticker", ""),
-                "teams": extract_teams_from_text(title),
-                "_tokens": set(normalize_name(title + " " + no_sub).split()),
+                "teams": list(prepare_text(title)[0]),
+                "_teams_set": frozenset(prepare_text(title)[0]),
+                "_tokens": frozenset(map(_intern, normalize_name(" ".join((title, no_sub))).split())),
                 "_sport_category": category,
                 "_market_subtype": SERIES_MARKET_SUBTYPE.get(series_ticker, "unknown"),
                 "_floor_strike": float(floor_strike) if floor_strike is not None else None,
@@ -892,11 +1451,51 @@ def fetch_kalshi_sports(db=None):
     set_cached(db, cache_key, results)
     return results
 
-def fetch_sportsbook_odds(db=None, api_key=""):
-    """Fetch odds from The Odds API for major sports."""
+# Single writer thread for the big sportsbook cache blob: serializing it
+# into sqlite takes long enough that the scan response shouldn't wait on
+# it.  ThreadPoolExecutor threads are joined at interpreter exit, so the
+# write still lands before a short-lived handler process dies.
+_cache_writer = ThreadPoolExecutor(max_workers=1)
+
+# Module-level fetch pool for run_scan: three pthreads created once per
+# process instead of per request, reused across warm starts.  Executor
+# threads join at interpreter exit, same as the cache writer.
+_SCAN_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix="scan")
+
+def _persist_sportsbook_fetch(cache_key, results, api_quota):
+    """Write fetch results + quota counters on the writer thread.
+
+    Uses the writer thread's own cached connection — sqlite handles can't
+    cross threads — and is best-effort: a failed cache write only costs
+    the next scan a refetch.
+    """
+    try:
+        wdb = get_db()
+        with cache_txn(wdb):
+            if api_quota["remaining"] is not None or api_quota["used"] is not None:
+                wdb.execute("INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)",
+                            ["_odds_api_remaining", str(api_quota["remaining"] or 0)])
+                wdb.execute("INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)",
+                            ["_odds_api_used", str(api_quota["used"] or 0)])
+                now = time.time()
+                with _config_memo_lock:
+                    _config_memo["_odds_api_remaining"] = (now, str(api_quota["remaining"] or 0))
+                    _config_memo["_odds_api_used"] = (now, str(api_quota["used"] or 0))
+            set_cached(wdb, cache_key, results)
+    except Exception:
+        pass
+
+def fetch_sportsbook_odds(db=None, api_key="", sports=None):
+    """Fetch odds from The Odds API for major sports.
+
+    sports: optional upper-cased filter set; unrequested sports are not
+    fetched at all, which also saves Odds API request quota.
+    """
     if db is None:
         db = get_db()
-    cache_key = "sportsbook_odds"
+    categories = _filter_categories(sports)
+    cache_key = ("sportsbook_odds" if categories is None
+                 else "sportsbook_odds|" + ",".join(sorted(categories)))
     cached = get_cached(db, cache_key, ttl=SPORTSBOOK_CACHE_TTL)
     if cached is not None:
         return cached
@@ -913,13 +1512,27 @@ def fetch_sportsbook_odds(db=None, api_key=""):
         "soccer_epl",
         "mma_mixed_martial_arts",
     ]
+    if categories is not None:
+        sports_to_fetch = [s for s in sports_to_fetch
+                           if SPORT_KEY_TO_CATEGORY.get(s) in categories]
 
     # No bookmakers filter — the API returns ALL available bookmakers at no
     # extra credit cost.  More books = better consensus for the +EV engine.
-    all_events = []
+    results = []      # normalized entries, filled as each sport completes
+    priced_idx = []   # positions in results with a nonzero price
+    priced_odds = []  # their American odds, converted in one batch below
+    got_events = False
     api_errors = []
     api_quota = {"remaining": None, "used": None}  # from response headers
 
+    # Fetch tuning state from previous scans: per-sport response-time EMA
+    # and the worker count (shrunk after timeout-heavy scans).
+    meta = get_cached(db, "sport_fetch_meta", ttl=_SPORT_META_TTL) or {}
+    latency_ema = dict(meta.get("latency_ema", {}))
+    max_workers = int(meta.get("max_workers", 3))
+    scan_latency = {}
+    timed_out_sports = set()
+
     def _fetch_sport(sport, is_prop=False):
         """Fetch a single sport from The Odds API. Returns (events, headers).
         Retries once on transient errors (401/403/timeout)."""
@@ -931,10 +1544,18 @@ def fetch_sportsbook_odds(db=None, api_key=""):
                f"apiKey={api_key}&regions=us&markets={markets_param}"
                f"&oddsFormat=american")
 
+        # Adaptive deadline: 3x the sport's usual response time, clamped to
+        # 4-12s — a normally snappy sport fails fast instead of stalling.
+        ema = latency_ema.get(sport)
+        timeout = 12.0 if ema is None else min(12.0, max(4.0, ema * 3.0))
+
+        t0 = time.monotonic()
         for attempt in range(2):  # 1 retry on transient errors
-            data, headers = fetch_json_with_headers(url)
+            data, headers = fetch_json_with_headers(url, timeout=timeout)
             if isinstance(data, dict) and "_error" in data:
                 err = data["_error"]
+                if "timed out" in err.lower():
+                    timed_out_sports.add(sport)
                 if "429" in err or "quota" in err.lower() or "limit" in err.lower():
                     raise RuntimeError("QUOTA_EXCEEDED")
                 if ("401" in err or "403" in err) and attempt == 0:
@@ -947,6 +1568,7 @@ def fetch_sportsbook_odds(db=None, api_key=""):
                     continue
                 raise RuntimeError(err)
             break
+        scan_latency[sport] = time.monotonic() - t0
 
         events = []
         if isinstance(data, list):
@@ -957,18 +1579,128 @@ def fetch_sportsbook_odds(db=None, api_key=""):
                 events.append(event)
         return events, headers
 
+    def _parse_events(events):
+        """Normalize one sport's raw events straight into results so raw
+        payloads are released per sport instead of piling up for the whole
+        scan — the sportsbook blob is the largest object in the process."""
+        for event in events:
+            try:
+                home = event.get("home_team", "")
+                away = event.get("away_team", "")
+                commence = event.get("commence_time", "")
+                sport_key = event.get("_sport_key", "")
+                is_prop = event.get("_is_prop", False)
+
+                # Event-level fields are identical for every outcome of every
+                # bookmaker below — compute them once per event, not per entry.
+                try:
+                    commence_ts = datetime.fromisoformat(
+                        commence.replace("Z", "+00:00")).timestamp()
+                except (ValueError, TypeError):
+                    commence_ts = None
+                event_teams = extract_teams_from_text(f"{home} {away}")
+                event_tokens = frozenset(map(_intern, normalize_name(f"{away} {home}").split()))
+                event_name = f"{away} @ {home}"
+                sport_category = SPORT_KEY_TO_CATEGORY.get(sport_key, "other")
+                sport_display = SPORT_KEY_TO_DISPLAY.get(sport_key, "Sports")
+
+                for bookmaker in event.get("bookmakers", []):
+                    bk_name = bookmaker.get("key", "")
+                    bk_title = bookmaker.get("title", "")
+                    bk_last_update = bookmaker.get("last_update", "")
+
+                    for market in bookmaker.get("markets", []):
+                        market_key = market.get("key", "")
+                        # Market-level last_update is more granular than bookmaker-level
+                        mkt_last_update = market.get("last_update", "") or bk_last_update
+
+                        for outcome in market.get("outcomes", []):
+                            price = outcome.get("price", 0)
+                            # Coerce here, not in the columnar pass below —
+                            # one non-numeric price should drop one outcome,
+                            # not blow up the whole batch conversion.
+                            if not isinstance(price, (int, float)):
+                                try:
+                                    price = float(price)
+                                except (TypeError, ValueError):
+                                    continue
+                            if not price:
+                                continue  # zero odds carry no arb/EV signal
+                            name = outcome.get("name", "")
+                            point = outcome.get("point")
+                            description = outcome.get("description", "")
+
+                            entry = {
+                                "source": "sportsbook",
+                                "bookmaker": _intern(bk_name),
+                                "bookmaker_title": _intern(bk_title),
+                                "sport": _intern(sport_key),
+                                "home_team": home,
+                                "away_team": away,
+                                "commence_time": commence,
+                                "market_type": _intern(market_key),
+                                "outcome_name": _intern(name),
+                                "outcome_point": point,
+                                "description": _intern(description),
+                                "american_odds": price,
+                                "implied_prob": 0,
+                                "decimal_odds": 0,
+                                "is_prop": is_prop,
+                                "teams": event_teams,
+                                "_tokens": event_tokens | frozenset(
+                                    map(_intern, normalize_name(name).split())),
+                                "_sport_category": sport_category,
+                                "_sport_display": sport_display,
+                                # Lowercased once at parse time; the matcher
+                                # compares these per candidate pair.
+                                "_outcome_lc": _intern(name.lower()),
+                                "_description_lc": _intern(description.lower()),
+                                "event_name": event_name,
+                                "last_update": _intern(mkt_last_update),
+                                "_commence_ts": commence_ts,
+                            }
+                            results.append(entry)
+                            priced_idx.append(len(results) - 1)
+                            priced_odds.append(price)
+            except Exception:
+                continue
+
+
     # Stagger requests: 3 workers max to avoid per-second rate limits.
     # Even on higher tiers, 8 simultaneous hits can trigger throttling.
+    # All workers draw connections from the shared keep-alive pool, so the
+    # TLS handshake to the-odds-api.com is paid once per worker, not per GET.
     fetch_tasks = [(sport, False) for sport in sports_to_fetch]
-    fetch_tasks.append(("basketball_nba", True))  # NBA player props
-
-    with ThreadPoolExecutor(max_workers=3) as pool:
-        futures = [pool.submit(_fetch_sport, sport, is_prop)
-                   for sport, is_prop in fetch_tasks]
-        for future in as_completed(futures):
+    if categories is None or "nba" in categories:
+        fetch_tasks.append(("basketball_nba", True))  # NBA player props
+
+    # Skip sports that have been consistently slow so one bad upstream
+    # doesn't stall every scan; decay their EMA so they get re-probed
+    # after a few scans. Never skip everything.
+    kept_tasks = []
+    for sport, is_prop in fetch_tasks:
+        ema = latency_ema.get(sport)
+        if ema is not None and ema > _SPORT_SLOW_EMA:
+            latency_ema[sport] = ema * 0.8
+            continue
+        kept_tasks.append((sport, is_prop))
+    if kept_tasks:
+        fetch_tasks = kept_tasks
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    futures = [pool.submit(_fetch_sport, sport, is_prop)
+               for sport, is_prop in fetch_tasks]
+    # Per-request deadlines are enforced on the socket inside _http_get
+    # (including reused pooled connections); the as_completed timeout is
+    # a backstop so a trickling response body — which resets the socket
+    # timer on every recv — can't stall the whole fetch.
+    try:
+        for future in as_completed(futures, timeout=30):
             try:
-                events, headers = future.result(timeout=12)
-                all_events.extend(events)
+                events, headers = future.result()
+                if events:
+                    got_events = True
+                _parse_events(events)
                 # Track API quota from response headers
                 remaining = headers.get("x-requests-remaining") or headers.get("X-Requests-Remaining")
                 used = headers.get("x-requests-used") or headers.get("X-Requests-Used")
@@ -980,9 +1712,29 @@ def fetch_sportsbook_odds(db=None, api_key=""):
                 api_errors.append(str(e))
             except Exception:
                 continue
+    except TimeoutError:
+        api_errors.append("Sportsbook fetch timed out")
+    finally:
+        # Don't join stalled workers — their socket deadlines will reap
+        # them; queued tasks that never started are dropped.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    # Fold this scan's timings into the EMA and persist the tuning state.
+    # Timed-out sports count at the full deadline so their EMA climbs.
+    for sport in timed_out_sports:
+        scan_latency.setdefault(sport, 12.0)
+    for sport, secs in scan_latency.items():
+        prev = latency_ema.get(sport)
+        latency_ema[sport] = secs if prev is None else 0.7 * prev + 0.3 * secs
+    if len(timed_out_sports) * 4 > len(fetch_tasks):  # >25% timed out
+        max_workers = max(1, max_workers // 2)
+    elif not timed_out_sports and max_workers < 3:
+        max_workers += 1  # recover concurrency one step per clean scan
+    set_cached(db, "sport_fetch_meta",
+               {"latency_ema": latency_ema, "max_workers": max_workers})
 
     # If all requests failed, try stale cache before giving up
-    if not all_events and api_errors:
+    if not got_events and api_errors:
         # Always try stale cache first — even for "invalid key" which can be transient
         stale = get_stale_cached(db, cache_key)
         if stale is not None:
@@ -993,69 +1745,16 @@ def fetch_sportsbook_odds(db=None, api_key=""):
         if any(e == "QUOTA_EXCEEDED" for e in api_errors):
             raise RuntimeError("QUOTA_EXCEEDED: Odds API usage limit reached. Check your plan at https://the-odds-api.com")
 
-    # Parse into normalized format
-    results = []
-    for event in all_events:
-        try:
-            home = event.get("home_team", "")
-            away = event.get("away_team", "")
-            commence = event.get("commence_time", "")
-            sport_key = event.get("_sport_key", "")
-            is_prop = event.get("_is_prop", False)
-
-            for bookmaker in event.get("bookmakers", []):
-                bk_name = bookmaker.get("key", "")
-                bk_title = bookmaker.get("title", "")
-                bk_last_update = bookmaker.get("last_update", "")
-
-                for market in bookmaker.get("markets", []):
-                    market_key = market.get("key", "")
-                    # Market-level last_update is more granular than bookmaker-level
-                    mkt_last_update = market.get("last_update", "") or bk_last_update
-
-                    for outcome in market.get("outcomes", []):
-                        price = outcome.get("price", 0)
-                        name = outcome.get("name", "")
-                        point = outcome.get("point")
-                        description = outcome.get("description", "")
-
-                        imp_prob = american_to_implied_prob(price) if price != 0 else 0
-
-                        entry = {
-                            "source": "sportsbook",
-                            "bookmaker": bk_name,
-                            "bookmaker_title": bk_title,
-                            "sport": sport_key,
-                            "home_team": home,
-                            "away_team": away,
-                            "commence_time": commence,
-                            "market_type": market_key,
-                            "outcome_name": name,
-                            "outcome_point": point,
-                            "description": description,
-                            "american_odds": price,
-                            "implied_prob": imp_prob,
-                            "decimal_odds": american_to_decimal(price) if price != 0 else 0,
-                            "is_prop": is_prop,
-                            "teams": extract_teams_from_text(home + " " + away),
-                            "_tokens": set(normalize_name(away + " " + home + " " + name).split()),
-                            "_sport_category": SPORT_KEY_TO_CATEGORY.get(sport_key, "other"),
-                            "event_name": f"{away} @ {home}",
-                            "last_update": mkt_last_update,
-                        }
-                        results.append(entry)
-        except Exception:
-            continue
-
-    # Save API quota info for frontend display
-    if api_quota["remaining"] is not None or api_quota["used"] is not None:
-        db.execute("INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)",
-                   ["_odds_api_remaining", str(api_quota["remaining"] or 0)])
-        db.execute("INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)",
-                   ["_odds_api_used", str(api_quota["used"] or 0)])
-        db.commit()
+    # One columnar odds-conversion pass (vectorized when NumPy is around)
+    # instead of two Python conversion calls per outcome.
+    for k, dec in zip(priced_idx, scan_kernels.american_to_decimals(priced_odds)):
+        entry = results[k]
+        entry["decimal_odds"] = dec
+        entry["implied_prob"] = 1.0 / dec
 
-    set_cached(db, cache_key, results)
+    # Persist results + quota counters off the hot path — the caller gets
+    # its entries back without waiting on the serialize-and-commit.
+    _cache_writer.submit(_persist_sportsbook_fetch, cache_key, results, api_quota)
     return results
 
 # ─── Matching engine ──────────────────────────────────────────────────────────
@@ -1068,10 +1767,19 @@ def try_match_prediction_to_sportsbook(pred_market, sportsbook_entries):
     question = pred_market.get("question", "").lower()
     description = pred_market.get("description", "").lower()
     pred_teams = pred_market.get("teams", [])
-    full_text = question + " " + description
+    full_text = f"{question} {description}"
     pred_tokens = pred_market.get("_tokens", None)
     pred_date = _parse_event_date(pred_market.get("end_date", ""))
 
+    # Everything derivable from the prediction alone is hoisted out of the
+    # per-candidate loop — it runs once per prediction, not once per pair.
+    has_over_q = "over" in question
+    has_under_q = "under" in question
+    has_win_q = "win" in question or "winner" in question
+    pred_subtype = pred_market.get("_market_subtype", "unknown")
+    game_subtype = pred_subtype in ("h2h", "totals", "spreads", "winning_margin")
+    needs_both_teams = len(pred_teams) >= 2
+
     matches = []
 
     for sb in sportsbook_entries:
@@ -1093,11 +1801,9 @@ def try_match_prediction_to_sportsbook(pred_market, sportsbook_entries):
 
         # For game-specific markets (h2h, totals, spreads), BOTH teams must match
         # This prevents "Brighton at Sunderland" matching "Arsenal at Brighton"
-        pred_subtype = pred_market.get("_market_subtype", "unknown")
-        is_game_market = pred_subtype in ("h2h", "totals", "spreads", "winning_margin") or (
-            "winner" in question or "win" in question
-            or sb.get("market_type") in ("h2h", "totals", "spreads"))
-        if is_game_market and len(pred_teams) >= 2:
+        is_game_market = (game_subtype or has_win_q
+                          or sb.get("market_type") in ("h2h", "totals", "spreads"))
+        if is_game_market and needs_both_teams:
             if team_matches < 2:
                 continue  # skip — wrong game
 
@@ -1115,12 +1821,13 @@ def try_match_prediction_to_sportsbook(pred_market, sportsbook_entries):
         else:
             sb_event = sb.get("event_name", "").lower()
             sb_outcome = sb.get("outcome_name", "").lower()
-            text_sim = similarity_score(full_text, sb_event + " " + sb_outcome)
+            text_sim = similarity_score(full_text, f"{sb_event} {sb_outcome}")
         score += text_sim * 0.3
 
-        # Player name matching for props
+        # Player name matching for props (lowercased at parse time; the
+        # .lower() fallback only fires for pre-upgrade cache rows)
         if sb.get("description"):  # Player props have description field
-            player_name = sb["description"].lower()
+            player_name = sb.get("_description_lc") or sb["description"].lower()
             if player_name in full_text:
                 score += 0.4
 
@@ -1131,11 +1838,12 @@ def try_match_prediction_to_sportsbook(pred_market, sportsbook_entries):
                 score += 0.2
 
         # Market type matching
-        if "over" in question and sb["outcome_name"].lower() == "over":
+        sb_outcome_lc = sb.get("_outcome_lc") or sb.get("outcome_name", "").lower()
+        if has_over_q and sb_outcome_lc == "over":
             score += 0.15
-        elif "under" in question and sb["outcome_name"].lower() == "under":
+        elif has_under_q and sb_outcome_lc == "under":
             score += 0.15
-        elif "win" in question or "winner" in question:
+        elif has_win_q:
             if sb["market_type"] == "h2h":
                 score += 0.1
 
@@ -1161,24 +1869,11 @@ def compute_arb_binary(prob_a, prob_b, fee_a=0, fee_b=0):
     if prob_a <= 0 or prob_b <= 0:
         return None
 
-    # Gross cost to cover both sides
-    cost = prob_a + prob_b
+    gross_profit_pct, net_profit_pct, cost, net_cost = scan_kernels.arb_binary_pcts(
+        prob_a, prob_b, fee_a, fee_b)
     if cost >= 1.0:
         return None  # No arb
 
-    gross_profit_pct = (1.0 - cost) * 100
-
-    # Net after fees
-    # Fee reduces winnings: effective cost increases
-    adj_prob_a = prob_a + (1 - prob_a) * fee_a  # cost + fee on winnings
-    adj_prob_b = prob_b + (1 - prob_b) * fee_b
-    net_cost = adj_prob_a + adj_prob_b
-
-    if net_cost >= 1.0:
-        net_profit_pct = (1.0 - net_cost) * 100  # Will be negative
-    else:
-        net_profit_pct = (1.0 - net_cost) * 100
-
     return {
         "gross_arb_pct": round(gross_profit_pct, 3),
         "net_arb_pct": round(net_profit_pct, 3),
@@ -1193,16 +1888,9 @@ def compute_stake_allocation(prob_a, prob_b, bankroll):
     total = prob_a + prob_b
     if total >= 1.0:
         return None
-    stake_a = bankroll * prob_a / total * (1 / (1 - total + total))
-    stake_b = bankroll * prob_b / total * (1 / (1 - total + total))
-    # Simpler: for binary arb, stake proportional to probability
-    stake_a = round(bankroll * prob_a, 2)
-    stake_b = round(bankroll * prob_b, 2)
-    total_staked = stake_a + stake_b
-    payout_a = round(stake_a / prob_a, 2) if prob_a > 0 else 0
-    payout_b = round(stake_b / prob_b, 2) if prob_b > 0 else 0
-    # Equalize payouts
-    target_payout = bankroll  # aim for equal payouts
+    # Equal payouts: stake proportional to probability against a target
+    # payout of the full bankroll.
+    target_payout = bankroll
     stake_a = round(target_payout * prob_a, 2)
     stake_b = round(target_payout * prob_b, 2)
     total_staked = stake_a + stake_b
@@ -1216,11 +1904,107 @@ def compute_stake_allocation(prob_a, prob_b, bankroll):
     }
 
 
-def find_all_arb_opportunities(prediction_markets, sportsbook_entries, min_net_pct=-999):
+def build_team_index(sportsbook_entries):
+    """Index sportsbook entries by team name for candidate narrowing.
+
+    Built once per scan in run_scan and shared across the arb and EV
+    engines, turning their candidate lookup into a hash join instead of
+    a per-prediction scan over all entries.  Team names are the only
+    tokens that decide a match, so indexing them (rather than every
+    title token) keeps candidate lists tight — the date and subtype
+    indexes prune the remainder before any pair is scored.
+    """
+    team_index = defaultdict(set)
+    for i, sb in enumerate(sportsbook_entries):
+        for team in sb.get("teams", []):
+            if team:
+                team_index[team].add(i)
+    return team_index
+
+
+def _opp_id(key):
+    """Short stable opportunity id from a canonical dedup key.
+
+    Not security-sensitive — crc32 plus the key length is an order of
+    magnitude cheaper than md5 on these short strings and just as stable
+    across processes.
+    """
+    data = key.encode()
+    return f"{zlib.crc32(data):08x}{len(data):04x}"
+
+
+def _event_time_display(sb):
+    """(is_live, display) for an entry's event start.
+
+    Uses the epoch timestamp pre-parsed by fetch_sportsbook_odds when
+    present; falls back to parsing commence_time for other sources.
+    """
+    ts = sb.get("_commence_ts")
+    if ts is None:
+        commence = sb.get("commence_time", "")
+        if not commence:
+            return False, ""
+        try:
+            ts = datetime.fromisoformat(commence.replace("Z", "+00:00")).timestamp()
+        except Exception:
+            return False, ""
+    delta = int(ts - time.time())
+    if delta < 0:
+        return True, "LIVE"
+    days = delta // 86400
+    secs = delta - days * 86400
+    if days > 0:
+        return False, f"{days}d"
+    if secs > 3600:
+        return False, f"{secs // 3600}h"
+    return False, f"{secs // 60}m"
+
+
+def build_date_index(sportsbook_entries):
+    """Index entry positions by event date for candidate narrowing.
+
+    The matcher rejects candidates more than 2 days from the prediction's
+    end date anyway, so intersecting with this index up front is exact —
+    the scorer simply never sees the wrong week's games.  Entries without
+    a parseable date go into the always-eligible `undated` set.
+    """
+    date_index = defaultdict(set)
+    undated = set()
+    for i, sb in enumerate(sportsbook_entries):
+        d = _parse_event_date(sb.get("commence_time", ""))
+        if d is None:
+            undated.add(i)
+        else:
+            date_index[d].add(i)
+    return date_index, undated
+
+
+def build_sport_index(sportsbook_entries):
+    """Index entry positions by sport category for candidate narrowing.
+
+    The engine only pairs a prediction with entries of the same sport (or
+    with no category at all), so sharding up front turns that filter into
+    a set intersection instead of a per-prediction list scan — same-named
+    teams across sports (the Giants problem) never reach the scorer.
+    """
+    sport_index = defaultdict(set)
+    uncategorized = set()
+    for i, sb in enumerate(sportsbook_entries):
+        cat = sb.get("_sport_category")
+        if cat:
+            sport_index[cat].add(i)
+        else:
+            uncategorized.add(i)
+    return sport_index, uncategorized
+
+
+def find_all_arb_opportunities(prediction_markets, sportsbook_entries, min_net_pct=-999,
+                               team_index=None):
     """
     Find all arbitrage opportunities across prediction markets and sportsbooks.
     """
     opportunities = []
+    best_by_key = {}
 
     # Fees
     # Kalshi: dynamic fee = 0.07 * price * (1-price) per contract
@@ -1229,12 +2013,10 @@ def find_all_arb_opportunities(prediction_markets, sportsbook_entries, min_net_p
     POLYMARKET_FEE = 0.02  # 2% taker fee on winnings
     SPORTSBOOK_FEE = 0.0  # Built into odds
 
-    # Build team-to-entries index for candidate narrowing
-    team_index = defaultdict(set)
-    for i, sb in enumerate(sportsbook_entries):
-        for team in sb.get("teams", []):
-            if team:
-                team_index[team].add(i)
+    if team_index is None:
+        team_index = build_team_index(sportsbook_entries)
+    date_index, undated = build_date_index(sportsbook_entries)
+    sport_index, uncategorized = build_sport_index(sportsbook_entries)
 
     for pred in prediction_markets:
         source = pred.get("source", "")
@@ -1261,18 +2043,38 @@ def find_all_arb_opportunities(prediction_markets, sportsbook_entries, min_net_p
         if not pred_teams:
             continue  # can't match to sportsbook without team info
 
-        candidate_indices = set()
-        for team in pred_teams:
-            candidate_indices.update(team_index.get(team, set()))
-        if not candidate_indices:
+        # The membership probe is the reject path for unmatchable teams
+        # (futures, non-US leagues): one C-level hash per team, and most
+        # predictions bail right here without touching the index values.
+        hits = [team_index[team] for team in pred_teams if team in team_index]
+        if not hits:
             continue  # no sportsbook entries share a team
-        candidates = [sportsbook_entries[i] for i in candidate_indices]
-
-        # Further narrow by sport category
+        # Single-team predictions borrow the index set directly (read-only
+        # below); multi-team unions happen in one C-level set.union call.
+        candidate_indices = hits[0] if len(hits) == 1 else set().union(*hits)
+
+        # Intersect with the date index — same cutoff the matcher applies,
+        # evaluated here as set ops instead of per-pair date parsing.
+        pred_date = _parse_event_date(pred.get("end_date", ""))
+        if pred_date is not None:
+            eligible = set(undated)
+            for delta in range(-2, 3):
+                eligible |= date_index.get(pred_date + timedelta(days=delta), set())
+            candidate_indices = candidate_indices & eligible
+            if not candidate_indices:
+                continue  # right teams, wrong week
+
+        # Shard by sport before materializing candidates — entries across
+        # sports never match, so this is a set intersection instead of a
+        # list scan per prediction.
         pred_sport = pred.get("_sport_category")
         if pred_sport:
-            candidates = [c for c in candidates
-                          if not c.get("_sport_category") or c["_sport_category"] == pred_sport]
+            candidate_indices = candidate_indices & (sport_index.get(pred_sport, frozenset())
+                                                     | uncategorized)
+            if not candidate_indices:
+                continue
+
+        candidates = [sportsbook_entries[i] for i in candidate_indices]
 
         # Narrow by market type compatibility
         pred_subtype = pred.get("_market_subtype", "unknown")
@@ -1303,6 +2105,13 @@ def find_all_arb_opportunities(prediction_markets, sportsbook_entries, min_net_p
         # Find matching sportsbook entries
         matches = try_match_prediction_to_sportsbook(pred, candidates)
 
+        # Over/under flags for the totals alignment below depend only on the
+        # prediction — evaluate the compiled patterns once, not per match.
+        pred_text = " ".join((pred.get("question", ""), pred.get("description", ""),
+                              pred.get("_no_sub_title", ""))).lower()
+        has_over = bool(_OVER_RE.search(pred_text))
+        has_under = bool(_UNDER_RE.search(pred_text))
+
         for match in matches:
             sb = match["sportsbook_entry"]
             confidence = match["confidence"]
@@ -1316,12 +2125,7 @@ def find_all_arb_opportunities(prediction_markets, sportsbook_entries, min_net_p
 
             if pred_subtype in ("totals", "player_props") and sb_market_type in ("totals", "player_points", "player_rebounds", "player_assists", "player_threes"):
                 # Explicit over/under alignment — price proximity fails for totals
-                # Check question, description, and _no_sub_title for over/under
-                pred_text = (pred.get("question", "") + " " + pred.get("description", "") + " "
-                             + pred.get("_no_sub_title", "")).lower()
                 sb_outcome_lower = sb.get("outcome_name", "").lower()
-                has_over = bool(re.search(r'\bover\b', pred_text))
-                has_under = bool(re.search(r'\bunder\b', pred_text))
                 if has_over or has_under:
                     pred_is_over = has_over and not has_under
                     sb_is_over = sb_outcome_lower == "over"
@@ -1356,51 +2160,16 @@ def find_all_arb_opportunities(prediction_markets, sportsbook_entries, min_net_p
                 diff_no = abs(no_price - sb_prob)
                 sb_same_as_yes = (diff_yes <= diff_no)
 
-            if sb_same_as_yes:
-                # sb same side as pred YES → arb: pred NO + sb
-                pred_price = no_price
-                pred_fee = (KALSHI_FEE_COEFF * pred_price) if is_kalshi else POLYMARKET_FEE
-                arb = compute_arb_binary(pred_price, sb_prob, pred_fee, SPORTSBOOK_FEE)
-                pred_side_raw = "No"
-            else:
-                # sb opposite side from pred YES → arb: pred YES + sb
-                pred_price = yes_price
-                pred_fee = (KALSHI_FEE_COEFF * pred_price) if is_kalshi else POLYMARKET_FEE
-                arb = compute_arb_binary(pred_price, sb_prob, pred_fee, SPORTSBOOK_FEE)
-                pred_side_raw = "Yes"
-
-            # Build descriptive sportsbook side label
-            sb_outcome = sb.get("outcome_name", "")
-            sb_point = sb.get("outcome_point")
-            if sb_point is not None and sb_outcome.lower() in ("over", "under"):
-                sb_side = f"{sb_outcome} {sb_point}"
-            elif sb_point is not None and sb_outcome.lower() not in ("over", "under"):
-                # Spreads: team name + point line (e.g., "Thunder -5.5")
-                sign = "+" if sb_point > 0 else ""
-                sb_side = f"{sb_outcome} {sign}{sb_point}"
-            else:
-                sb_side = sb_outcome
-
-            # Translate Yes/No into meaningful labels
-            pred_line = pred.get("_floor_strike")
-            no_sub = pred.get("_no_sub_title", "")
-            if pred_subtype == "totals" and pred_line is not None:
-                pred_side = f"Over {pred_line}" if pred_side_raw == "Yes" else f"Under {pred_line}"
-            elif pred_subtype == "h2h" and no_sub:
-                # no_sub_title has the YES team name (e.g., "Sacramento", "Phoenix")
-                yes_team = no_sub.strip()
-                if pred_side_raw == "Yes":
-                    pred_side = yes_team
-                else:
-                    # NO = the other team — find it from teams list
-                    pred_teams_list = pred.get("teams", [])
-                    other = [t for t in pred_teams_list
-                             if yes_team.lower() not in t]
-                    pred_side = other[0].title() if other else f"Not {yes_team}"
-            else:
-                pred_side = pred_side_raw
-            sb_price_display = sb.get("american_odds", 0)
+            # sb same side as pred YES → arb: pred NO + sb;
+            # sb opposite side → arb: pred YES + sb
+            pred_price = no_price if sb_same_as_yes else yes_price
+            pred_side_raw = "No" if sb_same_as_yes else "Yes"
+            pred_fee = (KALSHI_FEE_COEFF * pred_price) if is_kalshi else POLYMARKET_FEE
+            arb = compute_arb_binary(pred_price, sb_prob, pred_fee, SPORTSBOOK_FEE)
 
+            # Gate on the numbers (including the user's min_net_pct
+            # threshold) before any label/formatting work — most matches
+            # die here, so the ~25-key opp dict is never built for them.
             if arb is None or arb["gross_arb_pct"] <= 0:
                 continue
             if arb["gross_arb_pct"] > 15:
@@ -1408,133 +2177,231 @@ def find_all_arb_opportunities(prediction_markets, sportsbook_entries, min_net_p
             if arb["net_arb_pct"] < min_net_pct:
                 continue
 
-            # Determine sport
-            sport_display = _sport_display_from_entry(sb)
-
-            stakes = compute_stake_allocation(pred_price, sb_prob, 100)
-
-            # Time sensitivity
-            commence = sb.get("commence_time", "")
-            is_live = False
-            time_display = ""
-            if commence:
-                try:
-                    event_time = datetime.fromisoformat(commence.replace("Z", "+00:00"))
-                    now = datetime.now(timezone.utc)
-                    if event_time < now:
-                        is_live = True
-                        time_display = "LIVE"
-                    else:
-                        delta = event_time - now
-                        if delta.days > 0:
-                            time_display = f"{delta.days}d"
-                        elif delta.seconds > 3600:
-                            time_display = f"{delta.seconds // 3600}h"
-                        else:
-                            time_display = f"{delta.seconds // 60}m"
-                except Exception:
-                    time_display = ""
-
-            # Resolution risk
-            resolution_risk = "low"
-            risk_note = ""
-            gross_pct = arb["gross_arb_pct"]
-            if gross_pct > 10:
-                resolution_risk = "high"
-                risk_note = "Likely stale pricing — arb this large (>10%) usually means one side has outdated odds"
-            elif confidence < 0.6:
-                resolution_risk = "high"
-                risk_note = "Low match confidence — verify markets reference the same event and conditions"
-            elif confidence < 0.8:
-                resolution_risk = "medium"
-                risk_note = "Moderate match confidence — check resolution criteria on both platforms"
-            elif source != "sportsbook":
-                resolution_risk = "low"
-                risk_note = "Different platforms may use different data sources for settlement"
-
-            # Build descriptive event string
+            # Dedup race first, formatting later: key the candidate by the
+            # same (event, platforms, market) identity the opp id encodes and
+            # keep only the best net — losers never pay for labels or stakes.
             base_event = sb.get("event_name", pred.get("question", "")[:60])
+            pred_line = pred.get("_floor_strike")
             if pred_subtype == "totals" and pred_line is not None:
-                event_display = f"{base_event} — O/U {pred_line}"
+                suffix = f" — O/U {pred_line}"
             elif pred_subtype == "h2h":
-                event_display = f"{base_event} — ML"
+                suffix = " — ML"
             elif pred_subtype == "spreads":
-                event_display = f"{base_event} — Spread"
+                suffix = " — Spread"
             elif pred_subtype == "player_props":
-                event_display = f"{base_event} — Props"
+                suffix = " — Props"
             else:
-                event_display = base_event
+                suffix = ""
+            key = (base_event, suffix, source,
+                   sb.get("bookmaker_title", sb.get("bookmaker", "")),
+                   sb.get("market_type", "h2h"))
+            prev = best_by_key.get(key)
+            if prev is not None and arb["net_arb_pct"] <= prev[0]:
+                continue
+            best_by_key[key] = (arb["net_arb_pct"], pred, sb, confidence,
+                                pred_price, pred_side_raw, pred_fee, arb)
+
+
+    # Materialize only the dedup winners.  Candidates live as compact
+    # tuples until this pass, so the ~25-key opp dict (and its label,
+    # stake and risk formatting) is paid once per returned row rather
+    # than once per scored pair — the same budget a columnar layout
+    # would buy, without restructuring every engine around parallel
+    # arrays.
+    for key, packed in best_by_key.items():
+        base_event, suffix, source, bk_title, market_type = key
+        _net, pred, sb, confidence, pred_price, pred_side_raw, pred_fee, arb = packed
+        pred_subtype = pred.get("_market_subtype", "unknown")
+        pred_line = pred.get("_floor_strike")
 
-            opp = {
-                "id": hashlib.md5(f"{pred.get('id','')}-{sb.get('bookmaker','')}-{sb.get('outcome_name','')}-{pred_side}".encode()).hexdigest()[:12],
-                "type": "arb",
-                "sport": sport_display,
-                "event": event_display,
-                "event_detail": pred.get("question", ""),
-                "commence_time": commence,
-                "time_display": time_display,
-                "is_live": is_live,
-                "platform_a": {
-                    "name": source.capitalize(),
-                    "side": pred_side,
-                    "price": round(pred_price, 4),
-                    "implied_prob": round(pred_price, 4),
-                    "american_odds": implied_prob_to_american(pred_price),
-                    "fee_pct": pred_fee * 100,
-                    "url": pred.get("url", ""),
-                    "market_id": pred.get("id", ""),
-                },
-                "platform_b": {
-                    "name": sb.get("bookmaker_title", sb.get("bookmaker", "")),
-                    "side": sb_side,
-                    "price": sb_price_display,
-                    "implied_prob": round(sb_prob, 4),
-                    "american_odds": sb.get("american_odds", 0),
-                    "fee_pct": 0,
-                    "url": "",
-                    "market_id": "",
-                },
-                "market_type": sb.get("market_type", "h2h"),
-                "gross_arb_pct": arb["gross_arb_pct"],
-                "net_arb_pct": arb["net_arb_pct"],
-                "stakes": stakes,
-                "match_confidence": round(confidence, 2),
-                "resolution_risk": resolution_risk,
-                "risk_note": risk_note,
-                "is_prop": sb.get("is_prop", False),
-                "liquidity": pred.get("liquidity", 0),
-                "volume": pred.get("volume", 0),
-            }
-            opportunities.append(opp)
+        # Build descriptive sportsbook side label
+        sb_outcome = sb.get("outcome_name", "")
+        sb_point = sb.get("outcome_point")
+        if sb_point is not None and sb_outcome.lower() in ("over", "under"):
+            sb_side = f"{sb_outcome} {sb_point}"
+        elif sb_point is not None and sb_outcome.lower() not in ("over", "under"):
+            # Spreads: team name + point line (e.g., "Thunder -5.5")
+            sign = "+" if sb_point > 0 else ""
+            sb_side = f"{sb_outcome} {sign}{sb_point}"
+        else:
+            sb_side = sb_outcome
 
-    # Deduplicate: keep best arb per unique event+platforms pair
-    seen = {}
-    for opp in opportunities:
-        key = f"{opp['event']}-{opp['platform_a']['name']}-{opp['platform_b']['name']}-{opp['market_type']}"
-        if key not in seen or opp['net_arb_pct'] > seen[key]['net_arb_pct']:
-            seen[key] = opp
+        # Translate Yes/No into meaningful labels
+        no_sub = pred.get("_no_sub_title", "")
+        if pred_subtype == "totals" and pred_line is not None:
+            pred_side = f"Over {pred_line}" if pred_side_raw == "Yes" else f"Under {pred_line}"
+        elif pred_subtype == "h2h" and no_sub:
+            # no_sub_title has the YES team name (e.g., "Sacramento", "Phoenix")
+            yes_team = no_sub.strip()
+            if pred_side_raw == "Yes":
+                pred_side = yes_team
+            else:
+                # NO = the other team — find it from teams list
+                pred_teams_list = pred.get("teams", [])
+                other = [t for t in pred_teams_list
+                         if yes_team.lower() not in t]
+                pred_side = other[0].title() if other else f"Not {yes_team}"
+        else:
+            pred_side = pred_side_raw
+        sb_price_display = sb.get("american_odds", 0)
+
+        # Determine sport
+        sport_display = _sport_display_from_entry(sb)
+
+        stakes = compute_stake_allocation(pred_price, sb.get("implied_prob", 0), 100)
+
+        # Time sensitivity (pre-parsed timestamp, no per-opp ISO parse)
+        is_live, time_display = _event_time_display(sb)
+
+        # Resolution risk
+        resolution_risk = "low"
+        risk_note = ""
+        gross_pct = arb["gross_arb_pct"]
+        if gross_pct > 10:
+            resolution_risk = "high"
+            risk_note = "Likely stale pricing — arb this large (>10%) usually means one side has outdated odds"
+        elif confidence < 0.6:
+            resolution_risk = "high"
+            risk_note = "Low match confidence — verify markets reference the same event and conditions"
+        elif confidence < 0.8:
+            resolution_risk = "medium"
+            risk_note = "Moderate match confidence — check resolution criteria on both platforms"
+        elif pred.get("source", "") != "sportsbook":
+            resolution_risk = "low"
+            risk_note = "Different platforms may use different data sources for settlement"
 
-    deduped = sorted(seen.values(), key=lambda x: x['net_arb_pct'], reverse=True)
-    return deduped
+        event_display = base_event + suffix
+
+        # Canonical id over the event+platforms pair — run_scan's dedup
+        # keeps the best opportunity per id, so equivalent arbs on the
+        # same pair collapse there.
+        opp_key = f"arb|{event_display}|{source.capitalize()}|{bk_title}|{market_type}"
+        pred_price_r = round(pred_price, 4)  # shared by price and implied_prob
+        opp = {
+            "id": _opp_id(opp_key),
+            "type": "arb",
+            "sport": sport_display,
+            "event": event_display,
+            "event_detail": pred.get("question", ""),
+            "commence_time": sb.get("commence_time", ""),
+            "time_display": time_display,
+            "is_live": is_live,
+            "platform_a": {
+                "name": source.capitalize(),
+                "side": pred_side,
+                "price": pred_price_r,
+                "implied_prob": pred_price_r,
+                "american_odds": implied_prob_to_american(pred_price),
+                "fee_pct": pred_fee * 100,
+                "url": pred.get("url", ""),
+                "market_id": pred.get("id", ""),
+            },
+            "platform_b": {
+                "name": bk_title,
+                "side": sb_side,
+                "price": sb_price_display,
+                "implied_prob": round(sb.get("implied_prob", 0), 4),
+                "american_odds": sb.get("american_odds", 0),
+                "fee_pct": 0,
+                "url": "",
+                "market_id": "",
+            },
+            "market_type": market_type,
+            "gross_arb_pct": arb["gross_arb_pct"],
+            "net_arb_pct": arb["net_arb_pct"],
+            "stakes": stakes,
+            "match_confidence": round(confidence, 2),
+            "resolution_risk": resolution_risk,
+            "risk_note": risk_note,
+            "is_prop": sb.get("is_prop", False),
+            "liquidity": pred.get("liquidity", 0),
+            "volume": pred.get("volume", 0),
+        }
+        opportunities.append(opp)
+
+    # run_scan still dedups by id across sources; within this engine the
+    # by-key pass above already kept the best arb per pair.
+    return opportunities
+
+
+_engine_pool = None
+_engine_pool_lock = threading.Lock()
+
+def _get_engine_pool():
+    """Shared process pool for the CPU-bound matching engines.
+
+    Enabled by SCAN_PROCESS_WORKERS (>1); created once per process so
+    warm starts reuse the forked workers instead of paying spawn cost per
+    scan.  Returns None when disabled — the serverless deployment is
+    effectively single-core, where fork+pickle is pure loss, so the
+    default stays in-process.
+    """
+    global _engine_pool
+    try:
+        workers = int(os.environ.get("SCAN_PROCESS_WORKERS", "0"))
+    except ValueError:
+        workers = 0
+    if workers <= 1:
+        return None
+    with _engine_pool_lock:
+        if _engine_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            _engine_pool = ProcessPoolExecutor(max_workers=workers)
+    return _engine_pool
+
+
+def _submit_arb_chunks(pool, prediction_markets, sportsbook_entries, min_net_pct):
+    """Submit the arb engine to the pool in prediction chunks.
+
+    Per-prediction scoring is independent pure-Python work, so it chunks
+    cleanly; workers rebuild the team index locally, which is cheaper
+    than pickling a dict of sets across the fork.  Duplicate arbs
+    straddling chunk boundaries carry identical canonical ids and are
+    collapsed by run_scan's by-id dedup like any cross-source duplicate.
+    """
+    step = max(100, -(-len(prediction_markets) // pool._max_workers))
+    return [pool.submit(find_all_arb_opportunities,
+                        prediction_markets[i:i + step],
+                        sportsbook_entries, min_net_pct)
+            for i in range(0, len(prediction_markets), step)]
 
 # ─── Also check cross-prediction-market arbs ─────────────────────────────────
 
+# Risk tiers for cross-prediction arbs, indexed once per opportunity instead
+# of re-evaluating the gross/score conditions in two separate ternary ladders.
+# Single module-level objects: every opp dict references the same strings,
+# so no per-iteration value selection or allocation happens (CPython already
+# interns the short literals like "Kalshi"/"binary" at compile time).
+_XARB_RISK_TIERS = ("high", "medium", "low")
+_XARB_RISK_NOTES = (
+    "Likely stale pricing — arb this large (>10%) usually means one side has outdated odds",
+    "Cross-platform prediction market arb — verify both markets resolve on the same criteria",
+    "Cross-platform prediction market arb — verify both markets resolve on the same criteria",
+)
+
+
 def find_cross_prediction_arbs(poly_markets, kalshi_markets, min_net_pct=-999):
     """Find arbs between Polymarket and Kalshi on the same event."""
     opportunities = []
     KALSHI_FEE_COEFF = 0.07  # fee_on_winnings = 0.07 * contract_price
     POLYMARKET_FEE = 0.02
+    POLY_FEE_PCT = POLYMARKET_FEE * 100.0  # folded once, not per opp dict
 
     # Build team index for Kalshi markets
     kalshi_team_index = defaultdict(set)
+    kalshi_subtype_index = defaultdict(set)
     for i, km in enumerate(kalshi_markets):
         for team in km.get("teams", []):
             if team:
                 kalshi_team_index[team].add(i)
+        kalshi_subtype_index[km.get("_market_subtype", "unknown")].add(i)
+
+    all_kalshi_indices = set(range(len(kalshi_markets)))
 
     for pm in poly_markets:
         pm_question = pm.get("question", "").lower()
         pm_teams = pm.get("teams", [])
+        pm_teams_set = pm.get("_teams_set") or frozenset(pm_teams)
         pm_prices = pm.get("prices", [])
         pm_tokens = pm.get("_tokens", None)
 
@@ -1543,14 +2410,19 @@ def find_cross_prediction_arbs(poly_markets, kalshi_markets, min_net_pct=-999):
         if pm_prices[0] + pm_prices[1] < 0.90:
             continue  # illiquid — wide bid-ask creates phantom arbs
 
-        # Narrow Kalshi candidates by team overlap
+        # Narrow Kalshi candidates by team overlap, then block by subtype:
+        # a known-subtype question only ever matches the same subtype or
+        # unknown, so incompatible markets never reach the pairwise loop.
         if pm_teams:
-            candidate_indices = set()
-            for team in pm_teams:
-                candidate_indices.update(kalshi_team_index.get(team, set()))
-            candidates = [kalshi_markets[i] for i in candidate_indices]
+            hits = [kalshi_team_index[t] for t in pm_teams if t in kalshi_team_index]
+            candidate_indices = set().union(*hits) if hits else set()
         else:
-            candidates = kalshi_markets
+            candidate_indices = all_kalshi_indices
+        pm_subtype = pm.get("_market_subtype", "unknown")
+        if pm_subtype != "unknown" and candidate_indices:
+            candidate_indices = candidate_indices & (
+                kalshi_subtype_index[pm_subtype] | kalshi_subtype_index["unknown"])
+        candidates = [kalshi_markets[i] for i in candidate_indices]
 
         pm_date = _parse_event_date(pm.get("end_date", ""))
 
@@ -1564,16 +2436,27 @@ def find_cross_prediction_arbs(poly_markets, kalshi_markets, min_net_pct=-999):
             if km_prices[0] + km_prices[1] < 0.90:
                 continue  # illiquid — wide bid-ask creates phantom arbs
 
+            # Numeric prune before any text work: whichever orientation the
+            # alignment logic picks, its cost is PM yes plus one of the two
+            # Kalshi prices.  If neither combination lands in the
+            # 0 < gross <= 15% window enforced below, the pair can't
+            # survive — skip it without paying for dates or similarity.
+            if pm_prices[0] + min(km_prices[0], km_prices[1]) >= 1.0:
+                continue
+            if pm_prices[0] + max(km_prices[0], km_prices[1]) < 0.85:
+                continue
+
             # Date check — same teams can play on different dates
             km_date = _parse_event_date(km.get("end_date", ""))
             if not _dates_compatible(pm_date, km_date, max_days=2):
                 continue  # wrong date — skip
 
-            # Match by teams and text
-            team_overlap = len(set(pm_teams) & set(km_teams))
+            # Match by teams and text — precomputed frozensets, no per-pair
+            # set() rebuilds (the fallback covers rows from older caches)
+            km_teams_set = km.get("_teams_set") or frozenset(km_teams)
+            team_overlap = len(pm_teams_set & km_teams_set)
 
             # Market subtype must be compatible (don't match h2h vs totals)
-            pm_subtype = pm.get("_market_subtype", "unknown")
             km_subtype = km.get("_market_subtype", "unknown")
             if pm_subtype != "unknown" and km_subtype != "unknown":
                 if pm_subtype != km_subtype:
@@ -1600,7 +2483,11 @@ def find_cross_prediction_arbs(poly_markets, kalshi_markets, min_net_pct=-999):
 
             km_tokens = km.get("_tokens", None)
             if pm_tokens is not None and km_tokens is not None:
-                text_sim = similarity_score_from_tokens(pm_tokens, km_tokens)
+                # Below this similarity the 0.35 score cutoff can't be met,
+                # so the pruned 0 changes nothing downstream.
+                required_sim = (0.35 - team_overlap * 0.3) / 0.4
+                text_sim = similarity_score_from_tokens(
+                    pm_tokens, km_tokens, threshold=max(0.0, required_sim))
             else:
                 text_sim = similarity_score(pm_question, km_question)
             score = team_overlap * 0.3 + text_sim * 0.4
@@ -1614,10 +2501,10 @@ def find_cross_prediction_arbs(poly_markets, kalshi_markets, min_net_pct=-999):
 
             if pm_subtype in ("totals", "player_props"):
                 # Explicit over/under alignment for totals
-                pm_has_over = bool(re.search(r'\bover\b', pm_question))
-                pm_has_under = bool(re.search(r'\bunder\b', pm_question))
-                km_has_over = bool(re.search(r'\bover\b', km_question))
-                km_has_under = bool(re.search(r'\bunder\b', km_question))
+                pm_has_over = bool(_OVER_RE.search(pm_question))
+                pm_has_under = bool(_UNDER_RE.search(pm_question))
+                km_has_over = bool(_OVER_RE.search(km_question))
+                km_has_under = bool(_UNDER_RE.search(km_question))
                 if (pm_has_over or pm_has_under) and (km_has_over or km_has_under):
                     pm_is_over = pm_has_over and not pm_has_under
                     km_is_over = km_has_over and not km_has_under
@@ -1659,8 +2546,11 @@ def find_cross_prediction_arbs(poly_markets, kalshi_markets, min_net_pct=-999):
 
             stakes = compute_stake_allocation(pa_price, pb_price, 100)
 
+            tier = 0 if arb["gross_arb_pct"] > 10 else (1 if score < 0.6 else 2)
+            pa_price_r = round(pa_price, 4)
+            pb_price_r = round(pb_price, 4)
             opp = {
-                "id": hashlib.md5(f"cross-{pm.get('id','')}-{km.get('id','')}-{pa_side}".encode()).hexdigest()[:12],
+                "id": _opp_id(f"cross-{pm.get('id','')}-{km.get('id','')}-{pa_side}"),
                 "type": "arb",
                 "sport": "Sports",
                 "event": pm.get("question", "")[:60],
@@ -1671,18 +2561,18 @@ def find_cross_prediction_arbs(poly_markets, kalshi_markets, min_net_pct=-999):
                 "platform_a": {
                     "name": "Polymarket",
                     "side": pa_side,
-                    "price": round(pa_price, 4),
-                    "implied_prob": round(pa_price, 4),
+                    "price": pa_price_r,
+                    "implied_prob": pa_price_r,
                     "american_odds": implied_prob_to_american(pa_price),
-                    "fee_pct": POLYMARKET_FEE * 100,
+                    "fee_pct": POLY_FEE_PCT,
                     "url": pm.get("url", ""),
                     "market_id": pm.get("id", ""),
                 },
                 "platform_b": {
                     "name": "Kalshi",
                     "side": pb_side,
-                    "price": round(pb_price, 4),
-                    "implied_prob": round(pb_price, 4),
+                    "price": pb_price_r,
+                    "implied_prob": pb_price_r,
                     "american_odds": implied_prob_to_american(pb_price),
                     "fee_pct": round(kalshi_fee * 100, 2),
                     "url": km.get("url", ""),
@@ -1693,17 +2583,17 @@ def find_cross_prediction_arbs(poly_markets, kalshi_markets, min_net_pct=-999):
                 "net_arb_pct": arb["net_arb_pct"],
                 "stakes": stakes,
                 "match_confidence": round(score, 2),
-                "resolution_risk": "high" if arb["gross_arb_pct"] > 10 else ("medium" if score < 0.6 else "low"),
-                "risk_note": ("Likely stale pricing — arb this large (>10%) usually means one side has outdated odds"
-                              if arb["gross_arb_pct"] > 10
-                              else "Cross-platform prediction market arb — verify both markets resolve on the same criteria"),
+                "resolution_risk": _XARB_RISK_TIERS[tier],
+                "risk_note": _XARB_RISK_NOTES[tier],
                 "is_prop": False,
                 "liquidity": pm.get("liquidity", 0),
                 "volume": pm.get("volume", 0),
             }
             opportunities.append(opp)
 
-    return sorted(opportunities, key=lambda x: x['net_arb_pct'], reverse=True)
+    # No sort here: run_scan ranks the merged batches once (heap-selected
+    # under top_k), so an engine-level presort was pure duplicated work.
+    return opportunities
 
 
 # ─── Devigging & +EV engine ──────────────────────────────────────────────────
@@ -1841,7 +2731,41 @@ def _shin_devig(probs):
     return fair
 
 
+# Memo for build_fair_odds_index: burst scans within the sportsbook cache TTL
+# see an identical feed, so the whole devig pass can be reused.  Keyed by a
+# content hash of the entries; bounded to the TTL window because the staleness
+# weights inside depend on wall-clock time.
+_fair_index_memo = {"key": None, "index": None, "ts": 0.0}
+
+
+def _fair_index_content_key(sportsbook_entries, devig_method):
+    """Fast content hash over the fields the fair-odds index depends on."""
+    h = hashlib.md5(devig_method.encode())
+    for sb in sportsbook_entries:
+        h.update((
+            f"{sb.get('bookmaker','')}|{sb.get('away_team','')}@{sb.get('home_team','')}|"
+            f"{sb.get('market_type','')}|{sb.get('outcome_name','')}|{sb.get('outcome_point')}|"
+            f"{sb.get('implied_prob',0)}|{sb.get('commence_time','')}|{sb.get('last_update','')}"
+        ).encode())
+    return h.hexdigest()
+
+
 def build_fair_odds_index(sportsbook_entries, devig_method="power"):
+    """Memoizing wrapper around _build_fair_odds_index — see there for details.
+
+    Repeated scans while the sportsbook cache is warm pass byte-identical
+    entries, so the devig loops would recompute the exact same index.
+    """
+    key = _fair_index_content_key(sportsbook_entries, devig_method)
+    if (_fair_index_memo["key"] == key
+            and time.time() - _fair_index_memo["ts"] < SPORTSBOOK_CACHE_TTL):
+        return _fair_index_memo["index"]
+    index = _build_fair_odds_index(sportsbook_entries, devig_method)
+    _fair_index_memo.update(key=key, index=index, ts=time.time())
+    return index
+
+
+def _build_fair_odds_index(sportsbook_entries, devig_method="power"):
     """
     Build a fair-odds index using weighted multi-book consensus (Hubáček 2019).
     Devigs each bookmaker's line independently, then computes weighted average
@@ -2163,13 +3087,11 @@ def compute_ev(price, fair_prob, fee_rate=0.0):
     """
     if price <= 0 or price >= 1 or fair_prob <= 0:
         return None
-    payout = 1.0 / price
-    effective_payout = payout - (payout - 1.0) * fee_rate
-    ev = effective_payout * fair_prob - 1.0
-    return ev * 100
+    return scan_kernels.ev_pct(price, fair_prob, fee_rate)
 
 
-def find_ev_opportunities(prediction_markets, sportsbook_entries, fair_index, min_ev_pct=1.0):
+def find_ev_opportunities(prediction_markets, sportsbook_entries, fair_index, min_ev_pct=1.0,
+                          team_index=None):
     """
     Find +EV opportunities where prediction market prices beat fair odds.
     Reuses the existing matching engine to pair prediction markets with sportsbook events.
@@ -2178,12 +3100,9 @@ def find_ev_opportunities(prediction_markets, sportsbook_entries, fair_index, mi
     KALSHI_FEE_COEFF = 0.07
     POLYMARKET_FEE = 0.02
 
-    # Build team index
-    team_index = defaultdict(set)
-    for i, sb in enumerate(sportsbook_entries):
-        for team in sb.get("teams", []):
-            if team:
-                team_index[team].add(i)
+    if team_index is None:
+        team_index = build_team_index(sportsbook_entries)
+    sport_index, uncategorized = build_sport_index(sportsbook_entries)
 
     for pred in prediction_markets:
         source = pred.get("source", "")
@@ -2206,18 +3125,21 @@ def find_ev_opportunities(prediction_markets, sportsbook_entries, fair_index, mi
         if not pred_teams:
             continue
 
-        # Get candidate sportsbook entries by team
-        candidate_indices = set()
-        for team in pred_teams:
-            candidate_indices.update(team_index.get(team, set()))
-        if not candidate_indices:
+        # Get candidate sportsbook entries by team (one C-level union)
+        hits = [team_index[team] for team in pred_teams if team in team_index]
+        if not hits:
             continue
-        candidates = [sportsbook_entries[i] for i in candidate_indices]
+        candidate_indices = hits[0] if len(hits) == 1 else set().union(*hits)
 
-        # Filter by sport
+        # Shard by sport as a set intersection (see find_all_arb_opportunities)
         pred_sport = pred.get("_sport_category")
         if pred_sport:
-            candidates = [c for c in candidates if not c.get("_sport_category") or c["_sport_category"] == pred_sport]
+            candidate_indices = candidate_indices & (sport_index.get(pred_sport, frozenset())
+                                                     | uncategorized)
+            if not candidate_indices:
+                continue
+
+        candidates = [sportsbook_entries[i] for i in candidate_indices]
 
         # Filter by market type
         pred_subtype = pred.get("_market_subtype", "unknown")
@@ -2276,11 +3198,11 @@ def find_ev_opportunities(prediction_markets, sportsbook_entries, fair_index, mi
         sb_market_type = sb.get("market_type", "")
 
         if pred_subtype in ("totals", "player_props") and sb_market_type in ("totals", "player_points", "player_rebounds", "player_assists", "player_threes"):
-            pred_text = (pred.get("question", "") + " " + pred.get("description", "") + " "
-                         + pred.get("_no_sub_title", "")).lower()
+            pred_text = " ".join((pred.get("question", ""), pred.get("description", ""),
+                                  pred.get("_no_sub_title", ""))).lower()
             sb_outcome_lower = sb.get("outcome_name", "").lower()
-            has_over = bool(re.search(r'\bover\b', pred_text))
-            has_under = bool(re.search(r'\bunder\b', pred_text))
+            has_over = bool(_OVER_RE.search(pred_text))
+            has_under = bool(_UNDER_RE.search(pred_text))
             if has_over or has_under:
                 pred_is_over = has_over and not has_under
                 sb_is_over = sb_outcome_lower == "over"
@@ -2346,15 +3268,10 @@ def find_ev_opportunities(prediction_markets, sportsbook_entries, fair_index, mi
         if ev > 30:
             continue  # almost certainly stale data
 
-        # Determine live status early (needed for adaptive Kelly)
+        # Live status (needed early for adaptive Kelly) and time display in
+        # one shot from the pre-parsed timestamp — no per-opportunity ISO parse.
         commence = sb.get("commence_time", "")
-        is_live = False
-        if commence:
-            try:
-                event_time = datetime.fromisoformat(commence.replace("Z", "+00:00"))
-                is_live = event_time < datetime.now(timezone.utc)
-            except Exception:
-                pass
+        is_live, time_display = _event_time_display(sb)
 
         # Compute Kelly fractions
         gross_payout = 1.0 / pred_price if pred_price > 0 else 0
@@ -2401,23 +3318,6 @@ def find_ev_opportunities(prediction_markets, sportsbook_entries, fair_index, mi
         # Sport display
         sport_display = _sport_display_from_entry(sb)
 
-        # Time display (is_live and commence already set above)
-        time_display = ""
-        if commence:
-            try:
-                event_time = datetime.fromisoformat(commence.replace("Z", "+00:00"))
-                now = datetime.now(timezone.utc)
-                if event_time < now:
-                    is_live = True
-                    time_display = "LIVE"
-                else:
-                    delta = event_time - now
-                    if delta.days > 0: time_display = f"{delta.days}d"
-                    elif delta.seconds > 3600: time_display = f"{delta.seconds // 3600}h"
-                    else: time_display = f"{delta.seconds // 60}m"
-            except Exception:
-                time_display = ""
-
         base_event = sb.get("event_name", pred.get("question", "")[:60])
         if pred_subtype == "totals" and pred_line is not None:
             event_display = f"{base_event} — O/U {pred_line}"
@@ -2426,8 +3326,11 @@ def find_ev_opportunities(prediction_markets, sportsbook_entries, fair_index, mi
         else:
             event_display = base_event
 
+        # Canonical id per event+platform+market — see find_all_arb_opportunities
+        opp_key = (f"ev|{event_display}|{source.capitalize()}|"
+                   f"{sb.get('market_type', 'h2h')}")
         opp = {
-            "id": hashlib.md5(f"ev-{pred.get('id','')}-{sb.get('bookmaker','')}-{pred_side}".encode()).hexdigest()[:12],
+            "id": _opp_id(opp_key),
             "type": "ev",
             "sport": sport_display,
             "event": event_display,
@@ -2482,14 +3385,8 @@ def find_ev_opportunities(prediction_markets, sportsbook_entries, fair_index, mi
         }
         opportunities.append(opp)
 
-    # Deduplicate: keep best EV per event+platform
-    seen = {}
-    for opp in opportunities:
-        key = f"{opp['event']}-{opp['platform_a']['name']}-{opp['market_type']}"
-        if key not in seen or opp['ev_pct'] > seen[key]['ev_pct']:
-            seen[key] = opp
-
-    return sorted(seen.values(), key=lambda x: x['ev_pct'], reverse=True)
+    # Dedup happens once in run_scan via the canonical ids above.
+    return opportunities
 
 
 def find_cross_sportsbook_opportunities(sportsbook_entries, fair_index, min_ev_pct=1.0):
@@ -2590,31 +3487,20 @@ def find_cross_sportsbook_opportunities(sportsbook_entries, fair_index, min_ev_p
                         best_c_entry = best_per_outcome[2][1]
 
                         commence = best_a_entry.get("commence_time", "")
-                        is_live = False
-                        time_display = ""
-                        if commence:
-                            try:
-                                event_time = datetime.fromisoformat(commence.replace("Z", "+00:00"))
-                                now = datetime.now(timezone.utc)
-                                if event_time < now:
-                                    is_live = True
-                                    time_display = "LIVE"
-                                else:
-                                    delta = event_time - now
-                                    if delta.days > 0: time_display = f"{delta.days}d"
-                                    elif delta.seconds > 3600: time_display = f"{delta.seconds // 3600}h"
-                                    else: time_display = f"{delta.seconds // 60}m"
-                            except Exception:
-                                pass
+                        is_live, time_display = _event_time_display(best_a_entry)
 
                         sport_display = _sport_display_from_entry(best_a_entry)
 
+                        opp_event = f"{_display_event_key(event_key)} — ML (3-way)"
+                        opp_key = (f"x|{opp_event}|"
+                                   f"{best_a_entry.get('bookmaker_title', best_a_entry.get('bookmaker', ''))}|"
+                                   f"{best_per_outcome[0][0]}")
                         opp = {
-                            "id": hashlib.md5(f"xsb3-{event_key}-{mtype}-{'|'.join(outcomes[:3])}".encode()).hexdigest()[:12],
+                            "id": _opp_id(opp_key),
                             "type": "arb",
                             "n_sides": 3,
                             "sport": sport_display,
-                            "event": f"{_display_event_key(event_key)} — ML (3-way)",
+                            "event": opp_event,
                             "event_detail": f"3-way sportsbook arb: {best_a_entry.get('bookmaker_title', '')} / {best_b_entry.get('bookmaker_title', '')} / {best_c_entry.get('bookmaker_title', '')}",
                             "commence_time": commence,
                             "time_display": time_display,
@@ -2686,31 +3572,20 @@ def find_cross_sportsbook_opportunities(sportsbook_entries, fair_index, min_ev_p
                     xsb_kelly = max(0, (xsb_b * fair_p - (1.0 - fair_p)) / xsb_b) / 2.0 if xsb_b > 0 else 0
 
                     commence = best.get("commence_time", "")
-                    is_live = False
-                    time_display = ""
-                    if commence:
-                        try:
-                            event_time = datetime.fromisoformat(commence.replace("Z", "+00:00"))
-                            now = datetime.now(timezone.utc)
-                            if event_time < now:
-                                is_live = True
-                                time_display = "LIVE"
-                            else:
-                                delta = event_time - now
-                                if delta.days > 0: time_display = f"{delta.days}d"
-                                elif delta.seconds > 3600: time_display = f"{delta.seconds // 3600}h"
-                                else: time_display = f"{delta.seconds // 60}m"
-                        except Exception:
-                            pass
+                    is_live, time_display = _event_time_display(best)
 
                     sport_display = _sport_display_from_entry(best)
                     side_label = oname
 
+                    opp_event = f"{_display_event_key(event_key)} — ML (3-way)"
+                    opp_key = (f"x|{opp_event}|"
+                               f"{best.get('bookmaker_title', best.get('bookmaker', ''))}|"
+                               f"{side_label}")
                     opp = {
-                        "id": hashlib.md5(f"xev3-{event_key}-{mtype}-{oname}-{best.get('bookmaker','')}".encode()).hexdigest()[:12],
+                        "id": _opp_id(opp_key),
                         "type": "ev",
                         "sport": sport_display,
-                        "event": f"{_display_event_key(event_key)} — ML (3-way)",
+                        "event": opp_event,
                         "event_detail": f"+EV: {best.get('bookmaker_title', '')} {side_label} vs consensus fair odds",
                         "commence_time": commence,
                         "time_display": time_display,
@@ -2788,22 +3663,7 @@ def find_cross_sportsbook_opportunities(sportsbook_entries, fair_index, min_ev_p
                             continue  # both underdogs — flipped spread data
 
                     commence = best_a.get("commence_time", "")
-                    is_live = False
-                    time_display = ""
-                    if commence:
-                        try:
-                            event_time = datetime.fromisoformat(commence.replace("Z", "+00:00"))
-                            now = datetime.now(timezone.utc)
-                            if event_time < now:
-                                is_live = True
-                                time_display = "LIVE"
-                            else:
-                                delta = event_time - now
-                                if delta.days > 0: time_display = f"{delta.days}d"
-                                elif delta.seconds > 3600: time_display = f"{delta.seconds // 3600}h"
-                                else: time_display = f"{delta.seconds // 60}m"
-                        except Exception:
-                            pass
+                    is_live, time_display = _event_time_display(best_a)
 
                     sport_display = _sport_display_from_entry(best_a)
 
@@ -2819,11 +3679,15 @@ def find_cross_sportsbook_opportunities(sportsbook_entries, fair_index, min_ev_p
                             side_a = f"{side_a} {sign_a}{point}"
                             side_b = f"{side_b} {sign_b}{-point if point else ''}"
 
+                    opp_event = f"{_display_event_key(event_key)} — {'ML' if mtype == 'h2h' else mtype.replace('_', ' ').title()}"
+                    opp_key = (f"x|{opp_event}|"
+                               f"{best_a.get('bookmaker_title', best_a.get('bookmaker', ''))}|"
+                               f"{side_a}")
                     opp = {
-                        "id": hashlib.md5(f"xsb-{event_key}-{mtype}-{outcomes[i]}-{outcomes[j]}".encode()).hexdigest()[:12],
+                        "id": _opp_id(opp_key),
                         "type": "arb",
                         "sport": sport_display,
-                        "event": f"{_display_event_key(event_key)} — {'ML' if mtype == 'h2h' else mtype.replace('_', ' ').title()}",
+                        "event": opp_event,
                         "event_detail": f"Sportsbook arb: {best_a.get('bookmaker_title', '')} vs {best_b.get('bookmaker_title', '')}",
                         "commence_time": commence,
                         "time_display": time_display,
@@ -2911,30 +3775,9 @@ def find_cross_sportsbook_opportunities(sportsbook_entries, fair_index, min_ev_p
                             fair_p, xsb_b, xsb_adaptive.get("kelly_adaptive", xsb_kelly),
                             xsb_adaptive.get("kelly_confidence", 0.5)
                         )
-                        time_display = ""
-                        if commence:
-                            try:
-                                event_time = datetime.fromisoformat(commence.replace("Z", "+00:00"))
-                                now = datetime.now(timezone.utc)
-                                if event_time < now:
-                                    is_live = True
-                                    time_display = "LIVE"
-                                else:
-                                    delta = event_time - now
-                                    if delta.days > 0: time_display = f"{delta.days}d"
-                                    elif delta.seconds > 3600: time_display = f"{delta.seconds // 3600}h"
-                                    else: time_display = f"{delta.seconds // 60}m"
-                            except Exception:
-                                pass
-
-                        sport = best.get("sport", "").replace("_", " ").upper()
-                        if "nba" in sport.lower(): sport_display = "NBA"
-                        elif "nfl" in sport.lower(): sport_display = "NFL"
-                        elif "mlb" in sport.lower(): sport_display = "MLB"
-                        elif "nhl" in sport.lower(): sport_display = "NHL"
-                        elif "soccer" in sport.lower() or "mls" in sport.lower() or "epl" in sport.lower(): sport_display = "Soccer"
-                        elif "mma" in sport.lower(): sport_display = "MMA"
-                        else: sport_display = sport[:10] if sport else "Sports"
+                        is_live, time_display = _event_time_display(best)
+
+                        sport_display = _sport_display_from_entry(best)
 
                         side_label = outcome_name
                         if point is not None:
@@ -2948,11 +3791,15 @@ def find_cross_sportsbook_opportunities(sportsbook_entries, fair_index, min_ev_p
                         other_outcome = outcomes[j] if side_idx == 0 else outcomes[i]
                         other_best = best_b if side_idx == 0 else best_a
 
+                        opp_event = f"{_display_event_key(event_key)} — {'ML' if mtype == 'h2h' else mtype.replace('_', ' ').title()}"
+                        opp_key = (f"x|{opp_event}|"
+                                   f"{best.get('bookmaker_title', best.get('bookmaker', ''))}|"
+                                   f"{side_label}")
                         opp = {
-                            "id": hashlib.md5(f"xev-{event_key}-{mtype}-{outcome_name}-{best.get('bookmaker','')}".encode()).hexdigest()[:12],
+                            "id": _opp_id(opp_key),
                             "type": "ev",
                             "sport": sport_display,
-                            "event": f"{_display_event_key(event_key)} — {'ML' if mtype == 'h2h' else mtype.replace('_', ' ').title()}",
+                            "event": opp_event,
                             "event_detail": f"+EV: {best.get('bookmaker_title', '')} {side_label} vs consensus fair odds",
                             "commence_time": commence,
                             "time_display": time_display,
@@ -3005,14 +3852,8 @@ def find_cross_sportsbook_opportunities(sportsbook_entries, fair_index, min_ev_p
                         }
                         opportunities.append(opp)
 
-    # Deduplicate
-    seen = {}
-    for opp in opportunities:
-        key = f"{opp['event']}-{opp['platform_a']['name']}-{opp['platform_a']['side']}"
-        if key not in seen or (opp.get('ev_pct', 0) + opp.get('gross_arb_pct', 0)) > (seen[key].get('ev_pct', 0) + seen[key].get('gross_arb_pct', 0)):
-            seen[key] = opp
-
-    return sorted(seen.values(), key=lambda x: x.get('ev_pct', 0) + x.get('net_arb_pct', 0), reverse=True)
+    # Dedup happens once in run_scan via the canonical ids above.
+    return opportunities
 
 
 # ─── Alert Delivery ──────────────────────────────────────────────────────────
@@ -3514,16 +4355,39 @@ def resolve_tracked_bets(api_key, pending_bets):
 
 # ─── Core scan logic (callable from CGI or Vercel handler) ───────────────────
 
+def _parse_scan_params(params):
+    """Coerce raw query params once, up front.
+
+    Returns (min_net_pct, sports_filter, scan_mode, top_k) with min_pct
+    safely converted to float (bad input falls back to the default instead
+    of raising mid-scan), the sports filter pre-split, upper-cased, and
+    frozen so downstream filtering is a plain set-membership test, and
+    top_k coerced to int (0 = no cap).
+    """
+    try:
+        min_net_pct = float(params.get("min_pct", "-999"))
+    except (TypeError, ValueError):
+        min_net_pct = -999.0
+    sports_raw = params.get("sports", "")
+    sports_filter = frozenset(
+        s.strip().upper() for s in sports_raw.split(",") if s.strip()
+    ) if sports_raw else frozenset()
+    scan_mode = params.get("mode", "full")  # "quick" or "full"
+    try:
+        top_k = max(0, int(params.get("top_k", "0")))
+    except (TypeError, ValueError):
+        top_k = 0
+    return min_net_pct, sports_filter, scan_mode, top_k
+
+
 def run_scan(params):
     """Run the full scan and return the response dict.
     Supports mode='quick' for fast prediction-market-only scans that
     reuse cached sportsbook data, and mode='full' (default) for a
     complete refresh of all sources."""
     db = get_db()
-    scan_mode = params.get("mode", "full")  # "quick" or "full"
-
-    min_net_pct = float(params.get("min_pct", "-999"))
-    sports_filter = params.get("sports", "").split(",") if params.get("sports") else []
+    purge_stale(db)
+    min_net_pct, sports_filter, scan_mode, top_k = _parse_scan_params(params)
 
     api_key = (params.get("api_key", "")
                or os.environ.get("ODDS_API_KEY", "")
@@ -3537,7 +4401,7 @@ def run_scan(params):
         "sportsbook": "pending" if api_key else "no_key",
     }
 
-    all_opportunities = []
+    opportunity_batches = []  # per-engine result lists, merged once below
     poly_markets = []
     kalshi_markets = []
     sportsbook_entries = []
@@ -3545,32 +4409,63 @@ def run_scan(params):
     # In quick mode, skip the sportsbook API and reuse cached data.
     # This makes scans ~3× faster and costs zero Odds API quota.
     if scan_mode == "quick":
-        sportsbook_entries = get_stale_cached(db, "sportsbook_odds") or []
+        # Mirror the cache key fetch_sportsbook_odds writes: filtered scans
+        # store under "sportsbook_odds|<cats>", unfiltered under the bare
+        # key — reading only the bare key would miss every filtered row.
+        sb_cats = _filter_categories(sports_filter)
+        sb_key = ("sportsbook_odds" if sb_cats is None
+                  else "sportsbook_odds|" + ",".join(sorted(sb_cats)))
+        sportsbook_entries = get_stale_cached(db, sb_key) or []
+        if not sportsbook_entries and sb_cats is not None:
+            # No filtered row yet — an unfiltered scan's cache is a
+            # superset, so narrow it down rather than report no_data.
+            sportsbook_entries = [
+                e for e in (get_stale_cached(db, "sportsbook_odds") or [])
+                if e.get("_sport_category") in sb_cats
+            ]
         sources_status["sportsbook"] = "cached" if sportsbook_entries else "no_data"
 
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        future_poly = executor.submit(fetch_polymarket_sports, None)
-        future_kalshi = executor.submit(fetch_kalshi_sports, None)
-        future_sb = (executor.submit(fetch_sportsbook_odds, None, api_key)
-                     if api_key and scan_mode != "quick" else None)
-
+    # Three IO-bound fetchers in flight at once on the module-level scan
+    # pool (threads are created once per process, not per request); a
+    # single futures_wait bounds total wait at 15s for the whole batch —
+    # the old chained .result(timeout=15) calls each restarted the clock,
+    # so three slow sources could stack up to 45s.
+    future_poly = _SCAN_POOL.submit(fetch_polymarket_sports, None, sports_filter)
+    future_kalshi = _SCAN_POOL.submit(fetch_kalshi_sports, None, sports_filter)
+    future_sb = (_SCAN_POOL.submit(fetch_sportsbook_odds, None, api_key, sports_filter)
+                 if api_key and scan_mode != "quick" else None)
+
+    futs = [future_poly, future_kalshi] + ([future_sb] if future_sb is not None else [])
+    done, not_done = futures_wait(futs, timeout=15)
+    for fut in not_done:
+        fut.cancel()
+
+    if future_poly in done:
         try:
-            poly_markets = future_poly.result(timeout=15)
+            poly_markets = future_poly.result()
             sources_status["polymarket"] = "ok" if poly_markets else "empty"
         except Exception as e:
             sources_status["polymarket"] = "error"
             errors.append(f"Polymarket: {str(e)}")
+    else:
+        sources_status["polymarket"] = "error"
+        errors.append("Polymarket: fetch timed out")
 
+    if future_kalshi in done:
         try:
-            kalshi_markets = future_kalshi.result(timeout=15)
+            kalshi_markets = future_kalshi.result()
             sources_status["kalshi"] = "ok" if kalshi_markets else "empty"
         except Exception as e:
             sources_status["kalshi"] = "error"
             errors.append(f"Kalshi: {str(e)}")
+    else:
+        sources_status["kalshi"] = "error"
+        errors.append("Kalshi: fetch timed out")
 
-        if future_sb is not None:
+    if future_sb is not None:
+        if future_sb in done:
             try:
-                sportsbook_entries = future_sb.result(timeout=15)
+                sportsbook_entries = future_sb.result()
                 sources_status["sportsbook"] = "ok" if sportsbook_entries else "empty"
             except RuntimeError as e:
                 err_msg = str(e)
@@ -3584,20 +4479,43 @@ def run_scan(params):
             except Exception as e:
                 sources_status["sportsbook"] = "error"
                 errors.append(f"Sportsbook: {str(e)}")
-
-    # Find arbs: prediction markets vs sportsbooks
-    if sportsbook_entries:
-        if poly_markets:
-            arbs1 = find_all_arb_opportunities(poly_markets, sportsbook_entries, min_net_pct)
-            all_opportunities.extend(arbs1)
-        if kalshi_markets:
-            arbs2 = find_all_arb_opportunities(kalshi_markets, sportsbook_entries, min_net_pct)
-            all_opportunities.extend(arbs2)
-
-    # Find cross-prediction-market arbs
-    if poly_markets and kalshi_markets:
-        cross_arbs = find_cross_prediction_arbs(poly_markets, kalshi_markets, min_net_pct)
-        all_opportunities.extend(cross_arbs)
+        else:
+            sources_status["sportsbook"] = "error"
+            errors.append("Sportsbook: fetch timed out")
+
+    # Shared team index: built once, reused by the arb and EV engines below
+    sb_team_index = build_team_index(sportsbook_entries) if sportsbook_entries else None
+
+    # Matching engines: prediction markets vs sportsbooks, plus the
+    # cross-prediction pass.  With a process pool all three CPU-bound jobs
+    # run simultaneously; otherwise they run in-process as before.
+    engine_pool = _get_engine_pool()
+    if engine_pool is not None:
+        engine_futures = []
+        if sportsbook_entries and poly_markets:
+            engine_futures += _submit_arb_chunks(
+                engine_pool, poly_markets, sportsbook_entries, min_net_pct)
+        if sportsbook_entries and kalshi_markets:
+            engine_futures += _submit_arb_chunks(
+                engine_pool, kalshi_markets, sportsbook_entries, min_net_pct)
+        if poly_markets and kalshi_markets:
+            engine_futures.append(engine_pool.submit(
+                find_cross_prediction_arbs, poly_markets, kalshi_markets, min_net_pct))
+        for future in engine_futures:
+            opportunity_batches.append(future.result())
+    else:
+        if sportsbook_entries:
+            if poly_markets:
+                opportunity_batches.append(
+                    find_all_arb_opportunities(poly_markets, sportsbook_entries, min_net_pct,
+                                               team_index=sb_team_index))
+            if kalshi_markets:
+                opportunity_batches.append(
+                    find_all_arb_opportunities(kalshi_markets, sportsbook_entries, min_net_pct,
+                                               team_index=sb_team_index))
+        if poly_markets and kalshi_markets:
+            opportunity_batches.append(
+                find_cross_prediction_arbs(poly_markets, kalshi_markets, min_net_pct))
 
     # +EV detection: build fair odds index, find +EV opportunities
     devig_method = get_config(db, "devig_method", "power")
@@ -3607,15 +4525,21 @@ def run_scan(params):
 
         # +EV: prediction markets vs fair odds
         if poly_markets:
-            ev1 = find_ev_opportunities(poly_markets, sportsbook_entries, fair_index)
-            all_opportunities.extend(ev1)
+            opportunity_batches.append(
+                find_ev_opportunities(poly_markets, sportsbook_entries, fair_index,
+                                      team_index=sb_team_index))
         if kalshi_markets:
-            ev2 = find_ev_opportunities(kalshi_markets, sportsbook_entries, fair_index)
-            all_opportunities.extend(ev2)
+            opportunity_batches.append(
+                find_ev_opportunities(kalshi_markets, sportsbook_entries, fair_index,
+                                      team_index=sb_team_index))
 
         # Cross-sportsbook arbs & +EV
-        xsb = find_cross_sportsbook_opportunities(sportsbook_entries, fair_index)
-        all_opportunities.extend(xsb)
+        opportunity_batches.append(
+            find_cross_sportsbook_opportunities(sportsbook_entries, fair_index))
+
+    # Merge the engine outputs in one pass — a single correctly-sized list
+    # allocation instead of six incremental extend/resize operations.
+    all_opportunities = list(chain.from_iterable(opportunity_batches))
 
     # Filter out live games — odds change every few seconds, stale before
     # a manual scanner can act.  Keep only upcoming/pre-match events.
@@ -3623,10 +4547,14 @@ def run_scan(params):
     if not include_live:
         all_opportunities = [o for o in all_opportunities if not o.get("is_live")]
 
-    # Apply sports filter
-    if sports_filter and sports_filter[0]:
-        sports_set = set(s.upper() for s in sports_filter)
-        all_opportunities = [o for o in all_opportunities if o["sport"].upper() in sports_set]
+    # Residual sports filter.  The heavy lifting happens upstream — the
+    # fetchers take sports_filter and skip out-of-scope sports/series
+    # entirely, so the engines never pair them.  This pass only catches
+    # markets whose category was unknown at fetch time (kept upstream on
+    # purpose: they can still match once paired) but resolved during
+    # matching.
+    if sports_filter:
+        all_opportunities = [o for o in all_opportunities if o["sport"].upper() in sports_filter]
 
     # Deduplicate across all sources by id
     seen_ids = {}
@@ -3641,12 +4569,24 @@ def run_scan(params):
                 seen_ids[oid] = opp
     all_opportunities = list(seen_ids.values())
 
-    # Sort: arbs by net_arb_pct, +EV by ev_pct, arbs first
-    all_opportunities.sort(
-        key=lambda x: (0 if x.get("type") == "arb" else 1, -(x.get("net_arb_pct", 0) + x.get("ev_pct", 0))),
-    )
+    # Sort: arbs by net_arb_pct, +EV by ev_pct, arbs first.  A top_k cap
+    # selects with a bounded heap (O(M log K)) instead of sorting the full
+    # list; alerts, tracking, and the meta counts below still see every
+    # opportunity either way.
+    rank = lambda x: (x.get("type") == "arb",
+                      x.get("net_arb_pct", 0) + x.get("ev_pct", 0))
+    if top_k and len(all_opportunities) > top_k:
+        display_opportunities = heapq.nlargest(top_k, all_opportunities, key=rank)
+    else:
+        all_opportunities.sort(key=rank, reverse=True)
+        display_opportunities = all_opportunities
 
-    scan_duration = round(time.time() - scan_start, 2)
+    # One clock read feeds both the duration and the meta timestamp;
+    # time.strftime over gmtime is a single C call vs the datetime
+    # construct-localize-format chain.
+    scan_end = time.time()
+    scan_duration = round(scan_end - scan_start, 2)
+    scan_ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(scan_end))
 
     arb_count = sum(1 for o in all_opportunities if o.get("type") == "arb")
     ev_count = sum(1 for o in all_opportunities if o.get("type") == "ev")
@@ -3680,10 +4620,10 @@ def run_scan(params):
         pass
 
     return {
-        "opportunities": all_opportunities,
+        "opportunities": display_opportunities,
         "meta": {
             "scan_time": scan_duration,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": scan_ts,
             "total_opportunities": len(all_opportunities),
             "arb_count": arb_count,
             "ev_count": ev_count,
@@ -3700,15 +4640,50 @@ def run_scan(params):
         }
     }
 
+def run_scan_iter(params):
+    """Streaming variant of run_scan: yields ("meta", dict) first, then one
+    ("opp", dict) per opportunity in final sort order.  Lets the CGI layer
+    flush results line-by-line so the browser can start rendering while the
+    tail of the payload is still being serialized and sent."""
+    result = run_scan(params)
+    yield "meta", result["meta"]
+    for opp in result["opportunities"]:
+        yield "opp", opp
+
+
 # ─── CGI entry point (for local development) ─────────────────────────────────
 
+
+def _main_stream(params):
+    """Emit the scan as NDJSON with incremental flushes (?stream=1)."""
+    out = sys.stdout.buffer
+    out.write(b"Content-Type: application/x-ndjson\r\n\r\n")
+    out.flush()
+    try:
+        for kind, payload in run_scan_iter(params):
+            out.write(_json_dumps_bytes({kind: payload}))
+            out.write(b"\n")
+            out.flush()
+    except Exception as e:
+        out.write(json.dumps({"error": str(e)}).encode("utf-8"))
+        out.write(b"\n")
+        out.flush()
+
+
 def main():
-    print("Content-Type: application/json")
-    print()
     query_string = os.environ.get("QUERY_STRING", "")
-    params = dict(urllib.parse.parse_qsl(query_string))
+    # Fast path for the plain ASCII queries the dashboard sends; anything
+    # with %-escapes or + encodings falls back to the full parser.
+    if "%" in query_string or "+" in query_string:
+        params = dict(urllib.parse.parse_qsl(query_string))
+    else:
+        params = {k: v for k, v in
+                  (p.split("=", 1) for p in query_string.split("&") if "=" in p)}
+    if params.get("stream") == "1":
+        _main_stream(params)
+        return
     try:
-        print(json.dumps(run_scan(params), default=_json_default))
+        body = _json_dumps_bytes(run_scan(params))
     except Exception as e:
         err_msg = str(e)
         sources = {"polymarket": "error", "kalshi": "error", "sportsbook": "error"}
@@ -3718,7 +4693,7 @@ def main():
             sources["kalshi"] = "ok"
         elif "INVALID_KEY" in err_msg:
             sources["sportsbook"] = "invalid_key"
-        print(json.dumps({
+        body = _json_dumps_bytes({
             "opportunities": [],
             "meta": {
                 "scan_time": 0,
@@ -3730,7 +4705,11 @@ def main():
                 "errors": [err_msg],
                 "is_demo": False,
             }
-        }))
+        })
+    # Header + body in one buffer write — skips the TextIOWrapper encode
+    # round-trip and the extra flush syscalls of separate print() calls.
+    sys.stdout.buffer.write(b"Content-Type: application/json\r\n\r\n" + body + b"\n")
+    sys.stdout.buffer.flush()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+ArbScanner — numeric scoring kernels.
+
+The arb/EV inner-loop math is pure float arithmetic over probabilities, so
+it lives here free of dict lookups and branchy formatting code.  When Numba
+is installed the kernels are JIT-compiled with @njit; otherwise the plain
+Python definitions run unchanged (the Vercel runtime ships stdlib only, so
+the accelerator is strictly optional).
+"""
+
+
+def _no_jit(*args, **kwargs):
+    """Fallback decorator when Numba is unavailable — returns fn unchanged."""
+    if args and callable(args[0]):
+        return args[0]
+
+    def wrap(fn):
+        return fn
+    return wrap
+
+
+try:
+    from numba import njit
+except ImportError:
+    njit = _no_jit
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Batch kernels below fall back to list comprehensions without NumPy; the
+# vector path only engages for columns big enough to amortize array setup.
+_VEC_MIN = 32
+
+
+def kalshi_yes_probs(yes_prices):
+    """Convert a column of Kalshi yes prices (cents, or already 0-1) to probs."""
+    if np is not None and len(yes_prices) >= _VEC_MIN:
+        arr = np.asarray(yes_prices, dtype=np.float64)
+        return np.where(arr > 1.0, arr / 100.0, arr).tolist()
+    return [p / 100.0 if p > 1 else float(p) for p in yes_prices]
+
+
+def american_to_decimals(odds):
+    """Convert a column of American odds to decimal odds."""
+    if np is not None and len(odds) >= _VEC_MIN:
+        arr = np.asarray(odds, dtype=np.float64)
+        return np.where(arr > 0, arr / 100.0 + 1.0, 100.0 / -arr + 1.0).tolist()
+    out = []
+    for a in odds:
+        a = float(a)
+        out.append(a / 100.0 + 1.0 if a > 0 else 100.0 / -a + 1.0)
+    return out
+
+
+@njit(cache=True)
+def arb_binary_pcts(prob_a, prob_b, fee_a, fee_b):
+    """
+    Core binary-arb math: returns (gross_pct, net_pct, cost, net_cost).
+    Fees reduce winnings, so the effective cost of each leg rises by
+    (1 - prob) * fee.  Callers guard prob <= 0 and decide on cost >= 1.
+    """
+    cost = prob_a + prob_b
+    adj_a = prob_a + (1.0 - prob_a) * fee_a
+    adj_b = prob_b + (1.0 - prob_b) * fee_b
+    net_cost = adj_a + adj_b
+    return (1.0 - cost) * 100.0, (1.0 - net_cost) * 100.0, cost, net_cost
+
+
+@njit(cache=True)
+def ev_pct(price, fair_prob, fee_rate):
+    """
+    Expected value of a bet as a percentage.
+    price: implied probability (cost), fair_prob: estimated true probability,
+    fee_rate: fee as fraction of winnings.  Callers guard the domain.
+    """
+    payout = 1.0 / price
+    effective_payout = payout - (payout - 1.0) * fee_rate
+    return (effective_payout * fair_prob - 1.0) * 100.0
+
+
+# Pre-warm: with Numba present the first call pays compilation (cache=True
+# persists it to disk, but a cold cache still compiles for seconds).
+# Triggering it at import keeps the first scan of a fresh process fast.
+if njit is not _no_jit:  # pragma: no cover - only runs with numba installed
+    arb_binary_pcts(0.5, 0.5, 0.02, 0.0)
+    ev_pct(0.5, 0.5, 0.02)